@@ -8,7 +8,9 @@ from uuid import UUID
 
 from app.api import deps
 from app.db.session import get_db
-from app.db.models import User, Article, IngestionLog, AdminAuditLog, EmailSettings
+from app.db.models import User, Article, IngestionLog, AdminAuditLog, EmailSettings, IngestionSource
+from app.services.source_registry import SourceRegistry
+from app.services.source_health import health_summary
 
 router = APIRouter()
 
@@ -53,6 +55,45 @@ def get_dashboard_stats(
         "errors_today": errors_today
     }
 
+@router.get("/sources", response_model=List[dict])
+def get_source_health(
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(deps.get_current_admin),
+):
+    """
+    Health and circuit-breaker state of every ingestion source.
+    """
+    registry = SourceRegistry(db)
+    now = datetime.now(timezone.utc)
+    return [health_summary(s, now) for s in registry.sources]
+
+@router.post("/sources/{source_id}/reset")
+def reset_source_circuit(
+    source_id: str,
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(deps.get_current_admin),
+):
+    """
+    Close a source's circuit so the next scheduled run polls it again.
+    """
+    source = db.query(IngestionSource).filter(IngestionSource.id == source_id).first()
+    if not source:
+        raise HTTPException(status_code=404, detail="Source not found")
+
+    source.consecutive_failures = 0
+    source.circuit_open_until = None
+
+    # Audit Log
+    log = AdminAuditLog(
+        admin_id=current_admin.id,
+        action="RESET_SOURCE_CIRCUIT",
+        resource="ingestion_source",
+        details={"source_id": source_id, "last_error": source.last_error}
+    )
+    db.add(log)
+    db.commit()
+    return {"status": "Source circuit reset"}
+
 @router.get("/users", response_model=List[dict])
 def list_users(
     skip: int = 0,
@@ -13,7 +13,67 @@ class Settings(BaseSettings):
     # AI
     GEMINI_API_KEY: str | None = None
     OPENAI_API_KEY: str | None = None
-    AI_PROVIDER: str = "gemini" # gemini, openai
+    AI_PROVIDER: str = "gemini" # gemini, openai, simple, stub (local stub_llm_server.py)
+    AI_STUB_URL: str = "http://127.0.0.1:8765/v1" # OpenAI-compatible endpoint used by AI_PROVIDER=stub
+    AI_CONCURRENCY: int = 4 # Article batches in flight at once during ingestion
+    AI_REQUEST_TIMEOUT: float = 60.0 # Seconds per provider request before it is cancelled
+    AI_RATE_LIMIT_RPM: float = 15 # Shared request budget per minute across all AI tasks (0 = unlimited)
+    AI_RATE_LIMIT_BURST: int = 5
+    AI_RATE_LIMIT_BACKOFF: float = 30.0 # Default per-model cooldown after a 429, scaled by retry round
+    AI_BATCH_SIZE: int = 8 # Articles packed into one process_article prompt (1 = one request per article)
+    AI_BATCH_TOKEN_BUDGET: int = 6000 # Estimated input tokens per batched prompt
+    AI_ARTICLE_TOKEN_BUDGET: int = 750 # Estimated tokens of article content sent per article (after HTML/boilerplate stripping)
+    AI_RUN_TOKEN_BUDGET: int = 0 # LLM tokens (input + output) per ingestion run before the rest goes to the simple provider (0 = unlimited)
+    AI_DAILY_TOKEN_BUDGET: int = 0 # Same, summed over all runs since midnight UTC (0 = unlimited)
+    AI_ROUTING_THRESHOLD: float = 35 # Articles whose local relevance pre-score (0-100) is lower skip the LLM (0 = off)
+    QUOTE_MIN_SCORE: float = 30 # The enrichment prompt only asks for a quote if the article scores this on the quote prefilter (0-100, 0 = always)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_HOURS: int = 24 * 30
+    LLM_CACHE_MEMORY_ITEMS: int = 2000 # In-process LRU tier
+    LLM_CACHE_MAX_ROWS: int = 50_000 # llm_cache table is trimmed to this after each run
+    
+    # Ingestion Sources
+    # Per-source URLs, limits and poll intervals live in the ingestion_sources table
+    INGESTION_TICK_MINUTES: int = 5 # How often the scheduler checks which sources are due
+    SCHEDULER_IN_API: bool = True # Run the scheduler inside API processes; False when run_scheduler.py runs it instead
+    LEADER_LEASE_SECONDS: int = 600 # Job lease length; renewed every third of it while the job runs
+    POLL_REFRESH_HOURS: int = 2 # Minimum age of the active Daily Poll before a new one is generated
+    SOURCE_FAILURE_THRESHOLD: int = 3 # Consecutive failures before a source's circuit opens
+    SOURCE_BACKOFF_MINUTES: int = 30 # First back-off window; doubles on every failed probe
+    SOURCE_BACKOFF_MAX_MINUTES: int = 24 * 60
+    INGESTION_CHECKPOINT_RETENTION_DAYS: int = 7 # Per-item checkpoints kept this long (for --resume / --replay)
+    INGESTION_AUTO_RESUME_HOURS: int = 6 # Scheduled jobs first resume an interrupted run this recent (0 = never)
+    INGESTION_MAX_RESUMES: int = 3 # An interrupted run is given up after this many resumes
+    INGESTION_WORKERS: int = 0 # Worker processes a run shards enrichment and writes across (0 = in-process)
+    INGESTION_CLAIM_TIMEOUT_SECONDS: int = 300 # A claim its worker stopped refreshing is handed to another worker after this long
+    INGESTION_CLAIM_ATTEMPTS: int = 2 # Claims per item before it is left pending (the run stays PARTIAL for --resume)
+    
+    # Deduplication
+    DEDUP_BLOOM_CAPACITY: int = 200_000 # URLs held by the per-run seen-URL Bloom filter
+    DEDUP_BLOOM_ERROR_RATE: float = 1e-6 # False-positive rate (a new URL wrongly treated as known)
+    DEDUP_QUERY_CHUNK: int = 5000 # Max values per IN (...) lookup
+    NEAR_DUP_ENABLED: bool = True # Skip stories that retell an article stored in the window (MinHash + LSH)
+    NEAR_DUP_WINDOW_DAYS: int = 3 # How far back stored articles are matched against
+    NEAR_DUP_THRESHOLD: float = 0.6 # Estimated Jaccard similarity at which an item counts as a duplicate
+    
+    # Article writes
+    ARTICLE_WRITE_BATCH_SIZE: int = 50 # Rows per multi-row INSERT
+    ARTICLE_WRITE_FLUSH_SECONDS: float = 10.0 # Flush a partial batch after this long
+    PIPELINE_QUEUE_SIZE: int = 100 # Items buffered between ingestion stages before the producer waits (keep >= AI_BATCH_SIZE)
+    HN_API_URL: str = "https://hacker-news.firebaseio.com/v0"
+    HN_FETCH_CONCURRENCY: int = 8 # Max in-flight /item requests (1 = sequential)
+    HN_ITEM_TIMEOUT: float = 5.0 # Seconds per /item request
+    RSS_FETCH_CONCURRENCY: int = 16 # Max feeds in flight at once
+    RSS_FETCH_DEADLINE: float = 30.0 # Seconds; feeds still running after this are dropped for the run
+    FEED_PARSE_EXECUTOR: str = "process" # process, thread, inline (parse on the event loop)
+    FEED_PARSE_WORKERS: int = 2
+    
+    # Shared HTTP pool (one per ingestion run)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 64 # Idle connections kept open; never below HTTP_PER_HOST_CONNECTIONS
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0 # Seconds an idle connection is kept open
+    HTTP_PER_HOST_CONNECTIONS: int = 32 # Max concurrent requests to a single host
+    HTTP2_ENABLED: bool = False # Requires `pip install "httpx[http2]"`
     
     # Auth
     # Fallback to empty string, but validation will fail if not set.
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, Boolean, ARRAY, Text, func, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, Boolean, ARRAY, Text, func, ForeignKey
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from app.db.session import Base
@@ -41,6 +41,96 @@ class IngestionLog(Base):
 
     job_metadata = Column("metadata", JSONB)
 
+class IngestionRunItem(Base):
+    __tablename__ = "ingestion_run_items"
+
+    # Checkpoint of one fetched item within a run (see app/services/checkpoint.py)
+    run_id = Column(UUID(as_uuid=True), ForeignKey("ingestion_logs.id", ondelete="CASCADE"), primary_key=True)
+    url = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False) # Fetch order, so a resumed run sees the same batch
+    raw = Column(JSONB, nullable=False) # The fetched item as the fetchers returned it
+    state = Column(String, nullable=False, default="fetched") # 'fetched', 'pending', 'claimed', 'skipped', 'enriched', 'written'
+    ai_result = Column(JSONB, nullable=True)
+    article_id = Column(UUID(as_uuid=True), nullable=True)
+    # Sharded runs: the worker processing the item (see app/services/work_queue.py)
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class IngestionSource(Base):
+    __tablename__ = "ingestion_sources"
+
+    id = Column(String, primary_key=True) # e.g. 'hacker-news', 'techcrunch-ai'
+    type = Column(String, nullable=False) # 'arxiv', 'hacker_news', 'rss'
+    url = Column(String, nullable=False)
+    item_limit = Column(Integer, default=10)
+    poll_interval_minutes = Column(Integer, default=120)
+    concurrency = Column(Integer, nullable=True) # Max in-flight requests within the source (HN item fan-out)
+    enabled = Column(Boolean, default=True)
+    options = Column(JSONB) # Type-specific settings, e.g. {"search_query": "cat:cs.AI"} for Arxiv
+    last_polled_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Health / circuit breaker state (see app/services/source_health.py)
+    consecutive_failures = Column(Integer, default=0, server_default='0')
+    last_success_at = Column(DateTime(timezone=True), nullable=True)
+    last_failure_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    avg_latency_ms = Column(Integer, nullable=True) # Rolling (EWMA) fetch latency
+    circuit_open_until = Column(DateTime(timezone=True), nullable=True) # Skipped until then
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    # One row per job name; whoever holds an unexpired lease runs the job (see app/services/leader.py)
+    name = Column(String, primary_key=True) # e.g. 'ingestion'
+    holder = Column(String, nullable=False) # host:pid:nonce of the worker holding it
+    acquired_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class FeedValidator(Base):
+    __tablename__ = "feed_validators"
+
+    # Full request URL (query string included), one row per polled feed
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String(64), nullable=True) # sha256 of the last body we parsed
+    content_length = Column(Integer, default=0)
+    checked_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    # sha256 of (task, model, prompt version, normalized content hash)
+    key = Column(String(64), primary_key=True)
+    task = Column(String, nullable=False) # 'process_article', 'extract_quote', 'generate_poll'
+    model = Column(String, nullable=False)
+    response = Column(JSONB, nullable=False)
+    hits = Column(Integer, default=0, server_default='0')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class ArticleSignature(Base):
+    __tablename__ = "article_signatures"
+
+    # MinHash of the article's opening words (see app/services/near_dup.py)
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    minhash = Column(ARRAY(BigInteger), nullable=False)
+    bands = Column(ARRAY(String), nullable=False) # LSH band keys, GIN-indexed for overlap lookups
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class ArticleDuplicate(Base):
+    __tablename__ = "article_duplicates"
+
+    # A fetched item that was not stored because it retells an existing article
+    url = Column(String, primary_key=True)
+    canonical_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), nullable=False, index=True)
+    title = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    similarity = Column(Float, nullable=False) # Estimated Jaccard similarity to the canonical article
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class Quote(Base):
     __tablename__ = "quotes"
 
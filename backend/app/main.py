@@ -86,26 +86,26 @@ except ImportError:
     cgi.parse_header = parse_header
     sys.modules["cgi"] = cgi
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from app.services.ingestion import run_ingestion_job
+from app.services.scheduler import create_scheduler
 import asyncio
 
-scheduler = AsyncIOScheduler()
+scheduler = create_scheduler()
 
 from app.db.session import Base, engine
 
 @app.on_event("startup")
 async def start_scheduler():
-    # Run ingestion every 2 hours
-    scheduler.add_job(
-        run_ingestion_job,
-        trigger=IntervalTrigger(hours=2),
-        id="ingestion_job",
-        replace_existing=True
-    )
+    # With a dedicated scheduler worker (run_scheduler.py), API processes only serve requests
+    if not settings.SCHEDULER_IN_API:
+        logger.info("Scheduler disabled in the API process (SCHEDULER_IN_API=false).")
+        return
     scheduler.start()
-    logger.info("Scheduler started. Ingestion job scheduled every 2 hours.")
+    logger.info(f"Scheduler started. Due ingestion sources checked every {settings.INGESTION_TICK_MINUTES} minutes.")
     
     # Run immediately on startup so user doesn't wait
     # asyncio.create_task(run_ingestion_job())
+
+@app.on_event("shutdown")
+async def stop_workers():
+    from app.services.parsing import shutdown_parse_executor
+    shutdown_parse_executor()
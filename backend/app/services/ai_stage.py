@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.ai import ai_service
+from app.services.metrics import latency_summary
+from app.services.pipeline import StageQueue
+from app.services.quote_filter import wants_quote
+from app.services.routing import route
+from app.services.rate_limit import TokenBudget
+
+logger = logging.getLogger(__name__)
+
+class AIStage:
+    """
+    Bounded-concurrency AI processing for an ingestion run.
+    AIService calls are native coroutines; at most `concurrency` run at once and
+    requests are paced by AIService's shared token bucket and per-model 429 cooldowns.
+    Articles whose local relevance pre-score is below `routing_threshold` never
+    reach the LLM and get the simple provider's treatment instead, as does every
+    batch that starts after the run's token budget is used up. Only articles
+    passing the quote prefilter are asked for a quote. Articles can be
+    streamed in through a StageQueue while earlier batches are in flight.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, routing_threshold: Optional[float] = None,
+                 budget: Optional[TokenBudget] = None):
+        self.concurrency = concurrency or settings.AI_CONCURRENCY
+        self.routing_threshold = settings.AI_ROUTING_THRESHOLD if routing_threshold is None else routing_threshold
+        self.budget = budget or TokenBudget(settings.AI_RUN_TOKEN_BUDGET, settings.AI_DAILY_TOKEN_BUDGET)
+        self.tiers = {"llm": 0, "local": 0, "over_budget": 0}
+        self.quote_prompts = {"asked": 0, "skipped": 0}
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.calls = 0
+        self.failed = 0
+        self.articles = 0
+        self.article_seconds = 0.0
+        self.call_seconds: List[float] = []
+        # AIService counters are process-wide; report this run's share
+        self._hits_before = dict(ai_service.cooldowns.hits)
+        self._waited_before = ai_service.limiter.waited
+        self._requests_before = ai_service.limiter.acquired
+        self._fallbacks_before = ai_service.batch_fallbacks
+        self._batch_failed_before = ai_service.batch_failed
+        self._quote_tokens_before = ai_service.quote_tokens_saved
+        self._tokens_before = dict(ai_service.tokens)
+
+    def tokens_used(self) -> int:
+        """LLM tokens (input + output) spent since this stage was created."""
+        return sum(ai_service.tokens[k] - self._tokens_before.get(k, 0) for k in ai_service.tokens)
+
+    def over_budget(self) -> bool:
+        return self.budget.exhausted(self.tokens_used())
+
+    async def _call(self, fn: Callable[..., Awaitable], *args):
+        async with self.semaphore:
+            return await self._invoke(fn, *args)
+
+    async def _invoke(self, fn: Callable[..., Awaitable], *args):
+        started = time.perf_counter()
+        try:
+            result = await fn(*args)
+            self.calls += 1
+            return result
+        except Exception as e:
+            logger.error(f"AI call {getattr(fn, '__name__', fn)} failed: {e}")
+            self.failed += 1
+            return None
+        finally:
+            self.call_seconds.append(time.perf_counter() - started)
+
+    async def process_articles(self, raw_articles: List[Dict]) -> AsyncIterator[Tuple[Dict, Optional[Dict]]]:
+        """Yields (raw, ai_result) for a list of articles; see process_stream()."""
+        queue = StageQueue("ai")
+        for raw in raw_articles:
+            await queue.put(raw)
+        await queue.close()
+        async for item in self.process_stream(queue):
+            yield item
+
+    async def process_stream(self, queue: StageQueue) -> AsyncIterator[Tuple[Dict, Optional[Dict]]]:
+        """
+        Yields (raw, ai_result) for articles read from `queue` until it is closed,
+        as each group finishes; ai_result is None on failure.
+
+        Whatever is waiting in the queue (up to AI_BATCH_SIZE) becomes one group,
+        sent as batched prompts. Routed-down articles are answered on the spot,
+        with the pre-score as viability_score. A group only starts once a
+        concurrency slot is free, so a saturated AI stage stops reading its queue
+        and pushes back on the stages feeding it.
+        """
+        threshold = 0 if ai_service.provider == "simple" else self.routing_threshold
+        size = max(1, settings.AI_BATCH_SIZE)
+        finished: asyncio.Queue = asyncio.Queue()
+        tasks = set()
+
+        async def work(group):
+            try:
+                articles = [(raw['title'], raw['content']) for raw in group]
+                # Checked once the batch may start, so batches queued behind the limit degrade too
+                if self.over_budget():
+                    self.tiers["over_budget"] += len(group)
+                    results = ai_service.process_articles_locally(articles)
+                else:
+                    self.tiers["llm"] += len(group)
+                    want_quotes = [wants_quote(raw['title'], raw['content']) for raw in group]
+                    self.quote_prompts["asked"] += sum(want_quotes)
+                    self.quote_prompts["skipped"] += len(group) - sum(want_quotes)
+                    results = await self._invoke(ai_service.process_articles, articles, want_quotes)
+                finished.put_nowait((group, results or [None] * len(group)))
+            finally:
+                self.semaphore.release()
+
+        async def feed():
+            try:
+                while group := await queue.get_batch(size):
+                    llm_articles, local_articles = route(group, threshold)
+                    if local_articles:
+                        local_results = ai_service.process_articles_locally([(raw['title'], raw['content']) for raw, _ in local_articles])
+                        for (raw, score), result in zip(local_articles, local_results):
+                            result["viability_score"] = round(score)
+                        self.tiers["local"] += len(local_articles)
+                        finished.put_nowait(([raw for raw, _ in local_articles], local_results))
+                    if llm_articles:
+                        await self.semaphore.acquire()
+                        task = asyncio.create_task(work(llm_articles))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                while tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                finished.put_nowait(None)
+
+        started = time.perf_counter()
+        feeder = asyncio.create_task(feed())
+        try:
+            while (item := await finished.get()) is not None:
+                group, results = item
+                for raw, result in zip(group, results):
+                    if result is not None:
+                        self.articles += 1
+                    yield raw, result
+            await feeder # Re-raises a failure in the feeder
+        finally:
+            feeder.cancel()
+            for task in list(tasks):
+                task.cancel()
+            self.article_seconds += time.perf_counter() - started
+
+    async def map(self, fn: Callable[..., Awaitable], arg_tuples: List[Tuple]) -> List:
+        """Runs fn(*args) for every tuple concurrently; results keep input order (None on failure)."""
+        return await asyncio.gather(*(self._call(fn, *args) for args in arg_tuples))
+
+    def stats(self) -> dict:
+        minutes = self.article_seconds / 60
+        requests = ai_service.limiter.acquired - self._requests_before
+        hits = {
+            model: count - self._hits_before.get(model, 0)
+            for model, count in ai_service.cooldowns.hits.items()
+            if count > self._hits_before.get(model, 0)
+        }
+        return {
+            "calls": self.calls,
+            "failed": self.failed,
+            "concurrency": self.concurrency,
+            "articles": self.articles,
+            "article_seconds": round(self.article_seconds, 1),
+            "articles_per_min": round(self.articles / minutes, 1) if minutes else None,
+            "llm_requests": requests,
+            "requests_per_article": round(requests / self.articles, 2) if self.articles else None,
+            "batch_fallbacks": ai_service.batch_fallbacks - self._fallbacks_before,
+            "batch_failed": ai_service.batch_failed - self._batch_failed_before,
+            "quote_prefilter": {
+                "min_score": settings.QUOTE_MIN_SCORE,
+                **self.quote_prompts,
+                "prompt_tokens_saved": ai_service.quote_tokens_saved - self._quote_tokens_before,
+            },
+            "routing": {
+                "threshold": self.routing_threshold,
+                "tiers": self.tiers,
+            },
+            "tokens": {k: ai_service.tokens[k] - self._tokens_before.get(k, 0) for k in ai_service.tokens},
+            "budget": self.budget.stats(self.tokens_used()),
+            "call_latency": latency_summary(self.call_seconds),
+            "rate_limit_hits": hits,
+            "rate_limiter_wait_s": round(ai_service.limiter.waited - self._waited_before, 1),
+        }
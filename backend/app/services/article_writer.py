@@ -0,0 +1,150 @@
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import Article
+from app.services.dedup import url_deduplicator
+from app.services.metrics import latency_summary
+
+logger = logging.getLogger(__name__)
+
+class ArticleWriter:
+    """
+    Buffers processed articles and writes them with multi-row
+    INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+    A batch is flushed when it reaches `batch_size` rows or when `flush_interval`
+    seconds have passed since the last flush; inside `timed_flushes()` the
+    interval is kept by a timer, so rows do not wait for the next add() while
+    input pauses. Rows that lose a url race are
+    counted as duplicates; rows that only collide on slug are retried once with
+    a suffixed slug. If a batch fails outright (e.g. a row breaks a constraint)
+    it is retried row by row, so only the bad row is lost. `on_flush`, if set,
+    is called with each flush's inserted {url: id} after it commits.
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 on_flush: Optional[Callable[[Dict[str, uuid.UUID]], None]] = None):
+        self.db = db
+        self.on_flush = on_flush
+        self.batch_size = batch_size or settings.ARTICLE_WRITE_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.ARTICLE_WRITE_FLUSH_SECONDS
+        self.buffer: List[Dict] = []
+        self.last_flush = time.monotonic()
+
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.flushes = 0
+        self.flush_seconds: List[float] = []
+        self.inserted_ids: List[uuid.UUID] = []
+        self.inserted_urls: Dict[str, uuid.UUID] = {}
+
+    def add(self, values: Dict):
+        values.setdefault("id", uuid.uuid4())
+        self.buffer.append(values)
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer:
+            return
+        rows, self.buffer = self.buffer, []
+        self.flushes += 1
+        started = time.perf_counter()
+
+        failed = set()
+        try:
+            inserted = self._insert(rows)
+            self.db.commit()
+        except Exception as e:
+            logger.warning(f"Batch insert of {len(rows)} articles failed ({e}), retrying row by row")
+            self.db.rollback()
+            inserted, failed = self._insert_one_by_one(rows)
+
+        # Rows that did not come back (and did not error) collided on url or slug
+        skipped = [row for row in rows if row["url"] not in inserted and row["url"] not in failed]
+        if skipped:
+            inserted.update(self._retry_slug_conflicts(skipped))
+
+        self.inserted += len(inserted)
+        self.inserted_ids.extend(inserted.values())
+        self.inserted_urls.update(inserted)
+        url_deduplicator.remember(inserted.keys())
+        if self.on_flush:
+            self.on_flush(inserted)
+        self.flush_seconds.append(time.perf_counter() - started)
+        logger.info(f"Wrote {len(inserted)}/{len(rows)} articles")
+
+    async def _flush_timer(self):
+        while True:
+            await asyncio.sleep(max(0.0, self.last_flush + self.flush_interval - time.monotonic()))
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+
+    @contextlib.asynccontextmanager
+    async def timed_flushes(self):
+        """Flushes a partial batch every `flush_interval` seconds while the block runs, whether or not rows arrive."""
+        timer = asyncio.ensure_future(self._flush_timer())
+        try:
+            yield self
+        finally:
+            timer.cancel()
+            await asyncio.gather(timer, return_exceptions=True)
+
+    def close(self):
+        self.flush()
+
+    def _insert(self, rows: List[Dict]) -> Dict[str, uuid.UUID]:
+        stmt = pg_insert(Article).values(rows).on_conflict_do_nothing().returning(Article.id, Article.url)
+        return {row.url: row.id for row in self.db.execute(stmt)}
+
+    def _insert_one_by_one(self, rows: List[Dict]) -> Tuple[Dict[str, uuid.UUID], Set[str]]:
+        inserted, failed = {}, set()
+        for row in rows:
+            try:
+                inserted.update(self._insert([row]))
+                self.db.commit()
+            except Exception as e:
+                logger.error(f"Failed to write article {row.get('title')}: {e}")
+                self.db.rollback()
+                self.failed += 1
+                failed.add(row["url"])
+        return inserted, failed
+
+    def _retry_slug_conflicts(self, rows: List[Dict]) -> Dict[str, uuid.UUID]:
+        existing = {r.url for r in self.db.query(Article.url).filter(Article.url.in_([row["url"] for row in rows])).all()}
+        self.duplicates += len(existing)
+        retry = []
+        for row in rows:
+            if row["url"] in existing:
+                continue
+            # URL is new, so the slug was taken; make it unique
+            row["slug"] = f"{(row.get('slug') or 'article')[:190]}-{uuid.uuid4().hex[:6]}"
+            retry.append(row)
+        if not retry:
+            return {}
+        try:
+            inserted = self._insert(retry)
+            self.db.commit()
+            return inserted
+        except Exception:
+            self.db.rollback()
+            return self._insert_one_by_one(retry)[0]
+
+    def stats(self) -> dict:
+        return {
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "batch_size": self.batch_size,
+            "flush_latency": latency_summary(self.flush_seconds),
+        }
@@ -0,0 +1,162 @@
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import IngestionLog, IngestionRunItem
+
+logger = logging.getLogger(__name__)
+
+# Item lifecycle; a resumed run picks every item up from its last saved state
+FETCHED = "fetched" # Stored, not yet deduplicated
+PENDING = "pending" # New, waiting for AI
+CLAIMED = "claimed" # Sharded runs: taken by a worker process
+SKIPPED = "skipped" # Already ingested or a near-duplicate
+ENRICHED = "enriched" # AI result saved, not yet written
+WRITTEN = "written"
+
+class RunCheckpoint:
+    """
+    Per-item progress of one ingestion run, in the ingestion_run_items table.
+
+    The fetched batch is saved once, then each item's state moves forward as
+    the run does. AI results are buffered and saved together with the writer
+    flush that stores their articles, so a checkpoint costs two statements
+    per flush rather than one per item. Results lost in a crash are cheap to
+    redo: the LLM cache still has them.
+
+    Checkpointing never fails a run: if the table is missing or a write
+    fails, it logs and switches itself off.
+    """
+
+    def __init__(self, db: Session, run_id: uuid.UUID):
+        self.db = db
+        self.run_id = run_id
+        self.enabled = True
+        self.results: List[Dict] = []
+        self.saved_urls: Set[str] = set()
+
+    def load(self) -> List[IngestionRunItem]:
+        """The run's saved items in fetch order (empty if it never got past fetching)."""
+        try:
+            return (
+                self.db.query(IngestionRunItem)
+                .filter(IngestionRunItem.run_id == self.run_id)
+                .order_by(IngestionRunItem.position)
+                .all()
+            )
+        except Exception as e:
+            self._disable(f"could not load run {self.run_id}", e)
+            return []
+
+    def save_fetched(self, raw_articles: List[Dict]):
+        """Saves fetched items; may be called once per chunk as sources finish."""
+        rows = []
+        for raw in raw_articles:
+            if raw.get('url') and raw['url'] not in self.saved_urls:
+                self.saved_urls.add(raw['url'])
+                rows.append(dict(run_id=self.run_id, url=raw['url'], position=len(self.saved_urls), raw=raw, state=FETCHED))
+        chunk = settings.ARTICLE_WRITE_BATCH_SIZE * 10
+        self._execute(
+            [pg_insert(IngestionRunItem).values(rows[i:i + chunk]).on_conflict_do_nothing() for i in range(0, len(rows), chunk)],
+            "save fetched items",
+        )
+
+    def mark(self, urls: List[str], state: str):
+        chunk = settings.DEDUP_QUERY_CHUNK
+        self._execute(
+            [
+                update(IngestionRunItem)
+                .where(IngestionRunItem.run_id == self.run_id, IngestionRunItem.url.in_(urls[i:i + chunk]))
+                .values(state=state)
+                for i in range(0, len(urls), chunk)
+            ],
+            f"mark items {state}",
+        )
+
+    def add_result(self, raw: Dict, ai_result: Dict):
+        if self.enabled:
+            self.results.append({"run_id": self.run_id, "url": raw['url'], "state": ENRICHED, "ai_result": ai_result})
+
+    def flush(self, inserted: Optional[Dict[str, uuid.UUID]] = None):
+        """Saves buffered AI results, then marks `inserted` (url -> article id) written. Used as ArticleWriter's on_flush."""
+        results, self.results = self.results, []
+        if not self.enabled:
+            return
+        written = [
+            {"run_id": self.run_id, "url": url, "state": WRITTEN, "article_id": article_id}
+            for url, article_id in (inserted or {}).items()
+        ]
+        try:
+            # ORM bulk UPDATE by primary key: one executemany per list
+            if results:
+                self.db.execute(update(IngestionRunItem), results)
+            if written:
+                self.db.execute(update(IngestionRunItem), written)
+            self.db.commit()
+        except Exception as e:
+            self._disable("could not save results", e)
+
+    def _execute(self, statements: list, action: str):
+        if not self.enabled or not statements:
+            return
+        try:
+            for stmt in statements:
+                self.db.execute(stmt)
+            self.db.commit()
+        except Exception as e:
+            self._disable(f"could not {action}", e)
+
+    def _disable(self, what: str, error: Exception):
+        # Table missing (database/13_ingestion_checkpoint_schema.sql not applied yet) or a failed write
+        logger.warning(f"Run checkpoint disabled, {what}: {error}")
+        self.db.rollback()
+        self.enabled = False
+
+    @staticmethod
+    def prune(db: Session):
+        """Drops item checkpoints of runs older than INGESTION_CHECKPOINT_RETENTION_DAYS."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.INGESTION_CHECKPOINT_RETENTION_DAYS)
+        try:
+            old_runs = db.query(IngestionLog.id).filter(IngestionLog.run_at < cutoff)
+            deleted = (
+                db.query(IngestionRunItem)
+                .filter(IngestionRunItem.run_id.in_(old_runs.scalar_subquery()))
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            if deleted:
+                logger.info(f"Pruned {deleted} run checkpoint items")
+        except Exception as e:
+            logger.warning(f"Failed to prune run checkpoints: {e}")
+            db.rollback()
+
+def interrupted_run(db: Session, max_age_hours: float) -> Optional[IngestionLog]:
+    """
+    The most recent run that never finished (still PARTIAL: the process died
+    mid-run or the run left items pending, since a failing run is marked
+    FAILURE) and may still be resumed.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+    try:
+        log_entry = (
+            db.query(IngestionLog)
+            .filter(IngestionLog.status == "PARTIAL", IngestionLog.run_at >= cutoff)
+            .order_by(IngestionLog.run_at.desc())
+            .first()
+        )
+    except Exception as e:
+        logger.warning(f"Could not look up interrupted runs: {e}")
+        db.rollback()
+        return None
+    if log_entry and (log_entry.job_metadata or {}).get("resumed", 0) >= settings.INGESTION_MAX_RESUMES:
+        # Keeps dying at the same point; stop retrying it
+        log_entry.status = "FAILURE"
+        log_entry.errors = f"Interrupted; gave up after {settings.INGESTION_MAX_RESUMES} resumes"
+        db.commit()
+        return None
+    return log_entry
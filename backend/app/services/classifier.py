@@ -0,0 +1,116 @@
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Category order doubles as the tie-break (same precedence the old substring scan had)
+CATEGORIES = ["AI", "Software Engineering", "Computer Science", "Research"]
+DEFAULT_CATEGORY = "Research"
+
+CATEGORY_TERMS: Dict[str, List[str]] = {
+    "AI": [
+        "ai", "llm", "llms", "gpt", "chatgpt", "openai", "anthropic", "gemini", "claude", "transformer",
+        "transformers", "neural", "robot", "robots", "robotics", "agent", "agents", "generative", "diffusion",
+        "embedding", "embeddings", "model", "models", "machine learning", "deep learning", "language model",
+        "language models", "reinforcement learning", "fine tuning", "inference", "multimodal", "chatbot",
+    ],
+    "Software Engineering": [
+        "software", "code", "coding", "developer", "developers", "dev", "devops", "api", "apis", "sdk",
+        "framework", "frameworks", "library", "react", "python", "javascript", "typescript", "rust", "golang",
+        "java", "kubernetes", "docker", "github", "programming", "refactoring", "testing", "release",
+        "open source", "frontend", "backend", "microservices", "ci",
+    ],
+    "Computer Science": [
+        "computer", "computing", "algorithm", "algorithms", "system", "systems", "database", "databases",
+        "network", "networks", "networking", "distributed", "compiler", "compilers", "kernel", "cryptography",
+        "complexity", "quantum", "consensus", "graph", "operating system", "hardware", "chip", "chips", "gpu",
+    ],
+    "Research": [
+        "paper", "study", "researchers", "research", "arxiv", "dataset", "datasets", "benchmark",
+        "benchmarks", "experiment", "experiments", "theory", "theorem", "proof", "survey", "findings",
+        "university", "we propose", "results show",
+    ],
+}
+
+# Terms that are common outside their category count half
+WEAK_TERMS = {"model", "models", "system", "systems", "release", "testing", "graph", "research", "code", "network"}
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9+#]*")
+TITLE_WEIGHT = 2.0 # A keyword in the title counts as much as two in the body
+MAX_CONTENT_CHARS = 5000
+
+def tokenize(text: str) -> List[str]:
+    """Word tokens plus adjacent-word bigrams, so "ai" never matches inside "said"."""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+class KeywordClassifier:
+    """
+    Scores every category at once with a TF-IDF weighted keyword matrix.
+
+    The vocabulary (CATEGORY_TERMS) is compiled into a term x category weight
+    matrix once. Each article becomes a sparse {term id: count} vector holding
+    only the vocabulary terms it contains, so scoring costs one small product
+    over those terms' weight rows and does not grow with the vocabulary. IDF
+    defaults to 1 for every term; fit_idf() learns it from a corpus of texts.
+    """
+
+    def __init__(self, category_terms: Dict[str, List[str]] = CATEGORY_TERMS):
+        self.categories = [c for c in CATEGORIES if c in category_terms]
+        self.vocabulary: Dict[str, int] = {}
+        for category in self.categories:
+            for term in category_terms[category]:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        self.weights = np.zeros((len(self.vocabulary), len(self.categories)))
+        for c, category in enumerate(self.categories):
+            for term in category_terms[category]:
+                self.weights[self.vocabulary[term], c] = 0.5 if term in WEAK_TERMS else 1.0
+        # A term listed under several categories says less about each of them
+        self.weights /= np.maximum(1, (self.weights > 0).sum(axis=1, keepdims=True))
+        self.idf = np.ones(len(self.vocabulary))
+
+    def fit_idf(self, texts: Iterable[str]):
+        """Smoothed IDF of each vocabulary term over `texts`."""
+        df = np.zeros(len(self.vocabulary))
+        n = 0
+        for text in texts:
+            n += 1
+            ids = {self.vocabulary[t] for t in tokenize(text[:MAX_CONTENT_CHARS]) if t in self.vocabulary}
+            df[list(ids)] += 1
+        self.idf = np.log((1 + n) / (1 + df)) + 1
+
+    def _term_counts(self, articles: Sequence[Tuple[str, str]]) -> List[Dict[int, float]]:
+        """Sparse title-weighted counts per article: {term id: count} for the vocabulary terms it contains."""
+        docs = []
+        for title, content in articles:
+            counts: Dict[int, float] = {}
+            for text, weight in ((title or "", TITLE_WEIGHT), ((content or "")[:MAX_CONTENT_CHARS], 1.0)):
+                for term in tokenize(text):
+                    term_id = self.vocabulary.get(term)
+                    if term_id is not None:
+                        counts[term_id] = counts.get(term_id, 0.0) + weight
+            docs.append(counts)
+        return docs
+
+    def scores(self, articles: Sequence[Tuple[str, str]]) -> np.ndarray:
+        """Articles x categories matrix of TF-IDF scores (term vectors are L2-normalised before scoring)."""
+        scores = np.zeros((len(articles), len(self.categories)))
+        for row, counts in enumerate(self._term_counts(articles)):
+            if not counts:
+                continue
+            ids = np.fromiter(counts.keys(), dtype=int, count=len(counts))
+            tfidf = np.log1p(np.fromiter(counts.values(), dtype=float, count=len(counts))) * self.idf[ids]
+            scores[row] = (tfidf / np.linalg.norm(tfidf)) @ self.weights[ids]
+        return scores
+
+    def classify(self, articles: Sequence[Tuple[str, str]]) -> List[str]:
+        """Best category per (title, content); DEFAULT_CATEGORY when no keyword matches."""
+        scores = self.scores(articles)
+        best = scores.argmax(axis=1) if len(scores) else []
+        return [
+            self.categories[b] if scores[i, b] > 0 else DEFAULT_CATEGORY
+            for i, b in enumerate(best)
+        ]
+
+keyword_classifier = KeywordClassifier()
@@ -0,0 +1,95 @@
+import hashlib
+import logging
+import math
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import Article
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. `k` bit positions per item come from
+    double hashing a single blake2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class UrlDeduplicator:
+    """
+    Resolves which candidate URLs are already stored, for a whole batch at once.
+
+    URLs confirmed in the DB (or inserted during the run) go into a Bloom filter,
+    so a URL seen again later in the run (another source, a later chunk) is
+    answered without a query. The filter has a small false-positive rate
+    (DEDUP_BLOOM_ERROR_RATE): a brand-new URL can, rarely, be treated as known.
+    It is emptied at the start of every run with reset(), so articles deleted or
+    rolled back since do not stay "seen" in a long-running scheduler, and is
+    rebuilt once it holds DEDUP_BLOOM_CAPACITY URLs.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, error_rate: Optional[float] = None):
+        self.capacity = capacity or settings.DEDUP_BLOOM_CAPACITY
+        self.error_rate = error_rate or settings.DEDUP_BLOOM_ERROR_RATE
+        self.seen = BloomFilter(self.capacity, self.error_rate)
+        self.queries = 0
+
+    def reset(self):
+        self.seen = BloomFilter(self.capacity, self.error_rate)
+
+    def remember(self, urls: Iterable[str]):
+        for url in urls:
+            if self.seen.count >= self.capacity:
+                logger.info("URL Bloom filter full, starting a fresh one")
+                self.reset()
+            self.seen.add(url)
+
+    def known_urls(self, db: Session, urls: List[str]) -> Set[str]:
+        """Returns the subset of `urls` that is already ingested."""
+        known = {url for url in urls if url in self.seen}
+        unresolved = list({url for url in urls if url not in known})
+
+        chunk = settings.DEDUP_QUERY_CHUNK
+        for start in range(0, len(unresolved), chunk):
+            batch = unresolved[start:start + chunk]
+            self.queries += 1
+            rows = db.query(Article.url).filter(Article.url.in_(batch)).all()
+            found = {row.url for row in rows}
+            self.remember(found)
+            known |= found
+        return known
+
+def existing_values(db: Session, column, values: List[str]) -> Set[str]:
+    """One set-based lookup of which `values` already exist in `column`."""
+    found: Set[str] = set()
+    unique = list(set(values))
+    chunk = settings.DEDUP_QUERY_CHUNK
+    for start in range(0, len(unique), chunk):
+        rows = db.query(column).filter(column.in_(unique[start:start + chunk])).all()
+        found |= {row[0] for row in rows}
+    return found
+
+url_deduplicator = UrlDeduplicator()
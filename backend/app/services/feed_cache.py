@@ -0,0 +1,129 @@
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional
+
+import httpx
+from sqlalchemy.orm import Session
+from app.db.models import FeedValidator
+
+logger = logging.getLogger(__name__)
+
+class FeedCache:
+    """
+    Conditional GET cache for RSS/Arxiv feeds, backed by the feed_validators table.
+
+    Validators are loaded once per ingestion run and only written back by save(),
+    after the run has processed what it fetched. A crashed run therefore re-parses
+    its feeds next time instead of skipping entries it never stored, and so does
+    a run for the feeds whose entries it could not process (see save()).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.enabled = True
+        self.entries: Dict[str, dict] = {}
+        self.pending: Dict[str, dict] = {}
+        self.article_feeds: Dict[str, str] = {} # article url -> feed key, for entries parsed this run
+
+        self.not_modified = 0
+        self.unchanged = 0
+        self.held_back = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+
+        try:
+            for row in db.query(FeedValidator).all():
+                self.entries[row.url] = {
+                    "etag": row.etag,
+                    "last_modified": row.last_modified,
+                    "content_hash": row.content_hash,
+                    "content_length": row.content_length or 0,
+                }
+        except Exception as e:
+            # Table missing (database/08_feed_cache_schema.sql not applied yet)
+            logger.warning(f"Feed cache disabled, could not load validators: {e}")
+            db.rollback()
+            self.enabled = False
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        return str(httpx.URL(url, params=params))
+
+    def conditional_headers(self, key: str) -> dict:
+        entry = self.entries.get(key)
+        if not self.enabled or not entry:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def changed_content(self, key: str, response: httpx.Response) -> Optional[bytes]:
+        """
+        Returns the body to parse, or None if the feed has not changed since the
+        last saved run (304 Not Modified, or an identical body hash).
+        """
+        entry = self.entries.get(key)
+
+        if response.status_code == 304 and entry:
+            self.not_modified += 1
+            self.bytes_saved += entry["content_length"]
+            return None
+
+        content = response.content
+        self.bytes_downloaded += len(content)
+        if not self.enabled or response.status_code != 200:
+            return content
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        self.pending[key] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "content_length": len(content),
+        }
+        if entry and entry["content_hash"] == content_hash:
+            self.unchanged += 1
+            return None
+        return content
+
+    def track(self, key: str, articles: list) -> list:
+        """Remembers which feed `articles` were parsed from; returns them."""
+        for article in articles:
+            if article.get("url"):
+                self.article_feeds[article["url"]] = key
+        return articles
+
+    def save(self, unprocessed_urls: Iterable[str] = ()):
+        """
+        Writes back the validators fetched this run, except for feeds with an
+        entry in `unprocessed_urls` (its AI processing failed): those keep the
+        old validators, so the next run parses them again.
+        """
+        held = {self.article_feeds[url] for url in unprocessed_urls if url in self.article_feeds}
+        self.held_back = len(held & set(self.pending))
+        pending = {key: values for key, values in self.pending.items() if key not in held}
+        if not self.enabled or not pending:
+            return
+        try:
+            for url, values in pending.items():
+                self.db.merge(FeedValidator(url=url, **values))
+            self.db.commit()
+            self.entries.update(pending)
+            self.pending = {}
+        except Exception as e:
+            logger.error(f"Failed to save feed validators: {e}")
+            self.db.rollback()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "parses_skipped": self.not_modified + self.unchanged,
+            "held_back": self.held_back,
+            "bytes_saved": self.bytes_saved,
+            "bytes_downloaded": self.bytes_downloaded,
+        }
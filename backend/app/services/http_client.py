@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class PooledHTTPClient:
+    """
+    Long-lived httpx.AsyncClient shared by every source in an ingestion run.
+
+    Keeps TCP/TLS connections alive between sources, caps concurrent requests
+    per host and records connection reuse stats for the IngestionLog.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        per_host_connections: Optional[int] = None,
+        http2: Optional[bool] = None,
+    ):
+        self.per_host_connections = per_host_connections or settings.HTTP_PER_HOST_CONNECTIONS
+        self.http2 = settings.HTTP2_ENABLED if http2 is None else http2
+        if self.http2:
+            try:
+                import h2  # noqa: F401 (optional dependency: pip install "httpx[http2]")
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' is not installed. Falling back to HTTP/1.1.")
+                self.http2 = False
+
+        # A keepalive pool smaller than the per-host fan-out closes connections
+        # at full concurrency, so the per-host cap is its floor.
+        max_keepalive = max(max_keepalive or settings.HTTP_MAX_KEEPALIVE, self.per_host_connections)
+        limits = httpx.Limits(
+            max_connections=max_connections or settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry or settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        self.client = httpx.AsyncClient(
+            limits=limits,
+            http2=self.http2,
+            follow_redirects=True,
+            headers={"User-Agent": "SynapseDigest/1.0"},
+        )
+
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self.requests = 0
+        self.connections_opened = 0
+        self.connect_time = 0.0
+        self.host_requests: Dict[str, int] = {}
+
+    def _slot(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_connections)
+        return self._host_slots[host]
+
+    def _tracer(self):
+        started = {}
+
+        async def trace(event_name: str, info: dict):
+            # httpcore only emits connect events when a new connection is opened
+            if event_name == "connection.connect_tcp.started":
+                started["at"] = time.perf_counter()
+                self.connections_opened += 1
+            elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                if "at" in started:
+                    started["done"] = time.perf_counter()
+            elif event_name.endswith("send_request_headers.started") and "done" in started:
+                self.connect_time += started.pop("done") - started.pop("at")
+
+        return trace
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        host = urlsplit(url).netloc
+        extensions = kwargs.pop("extensions", {})
+        extensions["trace"] = self._tracer()
+        async with self._slot(host):
+            self.requests += 1
+            self.host_requests[host] = self.host_requests.get(host, 0) + 1
+            return await self.client.get(url, extensions=extensions, **kwargs)
+
+    def stats(self) -> dict:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "connect_time_ms": round(self.connect_time * 1000, 1),
+            "avg_connect_ms": round(self.connect_time * 1000 / self.connections_opened, 1) if self.connections_opened else 0.0,
+            "http2": self.http2,
+            "requests_per_host": dict(self.host_requests),
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -1,5 +1,8 @@
 import logging
 import asyncio
+import copy
+import re
+import uuid
 from datetime import datetime
 
 # Shim cgi for Python 3.13+ (feedparser dependency)
@@ -20,185 +23,563 @@ except ImportError:
     cgi.parse_header = parse_header
     sys.modules["cgi"] = cgi
 
+from typing import Dict, List, Optional, Set
+from datetime import timedelta, timezone
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
 from app.db.session import SessionLocal
+from app.core.config import settings
 from app.db.models import Article, IngestionLog
 from app.services.sources import fetcher
+from app.services.feed_cache import FeedCache
+from app.services.source_registry import SourceRegistry
+from app.services.dedup import url_deduplicator, existing_values
+from app.services.article_writer import ArticleWriter
 from app.services.ai import ai_service
+from app.services.ai_stage import AIStage
+from app.services.near_dup import NearDupIndex
+from app.services.checkpoint import RunCheckpoint, interrupted_run, FETCHED, PENDING, CLAIMED, SKIPPED, ENRICHED, WRITTEN
+from app.services.rate_limit import TokenBudget
+from app.services.llm_cache import llm_cache
+from app.services.leader import leader_lease
+from app.services.metrics import latency_summary
+from app.services.pipeline import Pipeline
+from app.services.work_queue import WorkQueue, merge_worker_stats, spawn_workers
 
 logger = logging.getLogger(__name__)
 
+POLL_CONTEXT_ARTICLES = 5 # The Daily Poll is generated from the first articles fetched
+INGESTION_LEASE = "ingestion"
+
+def slugify(title: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')
+    return slug[:200]
+
+def article_row(raw: Dict, ai_result: Dict, slug: str, taken_slugs: Set[str]) -> Dict:
+    """The articles row for a processed item; `slug` is made unique against (and added to) `taken_slugs`."""
+    pub_date = raw.get('published_at')
+    if isinstance(pub_date, int):
+        published_at = datetime.fromtimestamp(pub_date)
+    else:
+        published_at = datetime.now()
+
+    # Check for duplicate slug (existing rows or earlier in this batch)
+    if slug in taken_slugs:
+        # Append hash to make unique
+        slug = f"{slug}-{hash(raw['url']) % 10000}"
+    taken_slugs.add(slug)
+
+    return dict(
+        title=raw['title'],
+        slug=slug,
+        url=raw['url'],
+        source=raw['source'],
+        summary=ai_result.get('summary'),
+        original_snippet=raw['content'][:500] if raw.get('content') else None,
+        category=ai_result.get('category'),
+        viability_score=ai_result.get('viability_score'),
+        published_at=published_at,
+        is_processed=True
+    )
+
+def tokens_spent_today(db: Session) -> int:
+    """LLM tokens recorded by today's (UTC) runs, for AI_DAILY_TOKEN_BUDGET."""
+    if not settings.AI_DAILY_TOKEN_BUDGET:
+        return 0
+    midnight = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    spent = 0
+    for (metadata,) in db.query(IngestionLog.job_metadata).filter(IngestionLog.run_at >= midnight).all():
+        tokens = ((metadata or {}).get("ai") or {}).get("tokens") or {}
+        spent += tokens.get("input", 0) + tokens.get("output", 0)
+    return spent
+
 class IngestionService:
     def __init__(self, db: Session):
         self.db = db
 
-    async def run_pipeline(self):
-        logger.info("Starting ingestion pipeline...")
-        log_entry = IngestionLog(status="PARTIAL")
-        self.db.add(log_entry)
-        self.db.commit()
-        self.db.refresh(log_entry)
+    async def run_pipeline(self, due_only: bool = False, source_ids: Optional[List[str]] = None,
+                           resume_run_id: Optional[str] = None, replay_run_id: Optional[str] = None,
+                           workers: int = 0):
+        """
+        Fetches, processes and stores articles from the source registry.
+        `due_only` polls only sources whose interval has elapsed (scheduler tick);
+        `source_ids` polls the named sources regardless of schedule.
+        `resume_run_id` continues an interrupted run from its checkpoint, in the
+        same IngestionLog; `replay_run_id` runs the items a past run fetched
+        through dedup, enrichment and writes again as a new run, without
+        fetching. Items already stored (whoever wrote them) are skipped by
+        dedup like in any run, so a replay only enriches what is missing: it
+        does not redo or overwrite stored articles.
+        `workers` > 0 shards enrichment and writes across that many worker
+        processes (see WorkQueue); this process fetches, deduplicates, and
+        saves quotes and the poll once the workers are done.
+        A run that ends with items still pending (their AI processing failed,
+        or they ran out of INGESTION_CLAIM_ATTEMPTS) stays PARTIAL, so it can
+        be resumed like an interrupted run.
+        Returns the run's IngestionLog (None when no source was due).
+        """
+        registry = SourceRegistry(self.db)
+        saved_items = []
+        if resume_run_id:
+            log_entry = self.db.get(IngestionLog, uuid.UUID(str(resume_run_id)))
+            if not log_entry:
+                logger.error(f"Run {resume_run_id} not found, nothing to resume.")
+                return
+            if log_entry.status == "SUCCESS":
+                logger.info(f"Run {resume_run_id} already completed, nothing to resume.")
+                return log_entry
+            run_metadata = dict(log_entry.job_metadata or {})
+            run_metadata["resumed"] = run_metadata.get("resumed", 0) + 1
+            saved_items = RunCheckpoint(self.db, log_entry.id).load()
+            sources = [] if saved_items else registry.select(source_ids=run_metadata.get("sources") or None)
+            log_entry.status = "PARTIAL"
+            logger.info(f"Resuming ingestion run {log_entry.id} ({len(saved_items)} checkpointed items)")
+        else:
+            if replay_run_id:
+                saved_items = RunCheckpoint(self.db, uuid.UUID(str(replay_run_id))).load()
+                if not saved_items:
+                    logger.error(f"Run {replay_run_id} has no checkpointed items to replay.")
+                    return
+                sources = []
+            else:
+                sources = registry.select(due_only=due_only, source_ids=source_ids)
+                if not sources:
+                    logger.info("No ingestion sources due, skipping run.")
+                    return
+
+            logger.info(f"Starting ingestion pipeline for sources: {[s.id for s in sources]}")
+            log_entry = IngestionLog(status="PARTIAL")
+            self.db.add(log_entry)
+            self.db.commit()
+            self.db.refresh(log_entry)
+            run_metadata = {"sources": [s.id for s in sources]}
+            if replay_run_id:
+                run_metadata["replay_of"] = str(replay_run_id)
 
+        pipeline = Pipeline(settings.PIPELINE_QUEUE_SIZE)
+        run_metadata["stages"] = {}
+        # The seen-URL filter only vouches for URLs confirmed during this run
+        url_deduplicator.reset()
+        checkpoint = RunCheckpoint(self.db, log_entry.id)
+        # Items a resumed run finished before it was interrupted
+        resumed = {item.url: item for item in saved_items} if resume_run_id else {}
+        work_queue = WorkQueue(self.db, log_entry.id) if workers else None
+        if work_queue and not work_queue.available():
+            logger.warning("Processing the run in-process instead of across workers.")
+            work_queue = None
+        if not work_queue:
+            # A sharded run resumed in-process: workers must not join it
+            run_metadata.pop("work_queue", None)
+        processes = []
+        feed_cache = None
+        writer = None
         try:
-            # 1. Fetch from sources
-            arxiv_data = await fetcher.fetch_arxiv_papers(max_results=10)
-            hn_data = await fetcher.fetch_hacker_news(limit=10)
-            
-            # Generic RSS Feeds (Tech, AI, Eng)
-            rss_urls = [
-                "https://techcrunch.com/category/artificial-intelligence/feed/",
-                "https://www.theverge.com/rss/index.xml",
-                "https://openai.com/blog/rss.xml"
-            ]
-            rss_data = await fetcher.fetch_rss_feeds(rss_urls)
-            
-            all_raw_articles = arxiv_data + hn_data + rss_data
-            new_articles_count = 0
-            
-            for raw in all_raw_articles:
-                # 2. Check deduplication
-                exists = self.db.query(Article).filter(Article.url == raw['url']).first()
-                if exists:
-                    continue
-                
-                # 3. AI Processing
-                logger.info(f"Processing new article: {raw['title']}")
-
-                try:
-                    ai_result = ai_service.process_article(raw['title'], raw['content'])
-                    
-                    # 4. Normalization
-                    pub_date = raw.get('published_at')
-                    if isinstance(pub_date, int):
-                        published_at = datetime.fromtimestamp(pub_date)
-                    else:
-                        published_at = datetime.now() 
-                    
-                    # Slugify
-                    import re
-                    slug_base = raw['title'].lower()
-                    slug_base = re.sub(r'[^a-z0-9]+', '-', slug_base).strip('-')
-                    if len(slug_base) > 200:
-                        slug_base = slug_base[:200]
-                    
-                    # Check for duplicate slug
-                    existing_slug = self.db.query(Article).filter(Article.slug == slug_base).first()
-                    if existing_slug:
-                            # Append hash to make unique
-                            slug_base = f"{slug_base}-{hash(raw['url']) % 10000}"
-                    
-                    # Simple Mode: Instant
-
-                    article = Article(
-                        title=raw['title'],
-                        slug=slug_base,
-                        url=raw['url'],
-                        source=raw['source'],
-                        summary=ai_result.get('summary'),
-                        original_snippet=raw['content'][:500] if raw.get('content') else None,
-                        category=ai_result.get('category'),
-                        viability_score=ai_result.get('viability_score'),
-                        published_at=published_at,
-                        is_processed=True
-                    )
-                    
-                    self.db.add(article)
-                    self.db.commit() # Commit individually
-                    new_articles_count += 1
-                except Exception as loop_e:
-                    logger.error(f"Failed to process article {raw['title']}: {loop_e}")
-                    self.db.rollback()
-                    continue
-            
-                    self.db.commit() # Commit individually
-                    new_articles_count += 1
-                except Exception as loop_e:
-                    logger.error(f"Failed to process article {raw['title']}: {loop_e}")
-                    self.db.rollback()
-                    continue
-            
-            # 6. Extract Quotes from Interviews/Speeches (Updated Feature)
-            # Scan the newly processed raw articles for quote-worthy content
-            logger.info("Scanning for quotes...")
-            keywords = ["interview", "speech", "talk", "says", "warns", "predicts", "statement", "keynote"]
-            from app.db.models import Quote
-            
-            for raw in all_raw_articles:
-                # Basic filter to save tokens
-                text_to_scan = raw['title'].lower()
-                if any(k in text_to_scan for k in keywords):
+            # Stages run concurrently, linked by bounded queues: the first articles are
+            # enriched and written while later sources are still downloading
+            fetched = pipeline.queue("fetched") # One chunk per finished source (each RSS feed on its own)
+            to_enrich = pipeline.queue("enrich")
+            to_write = pipeline.queue("write")
+            to_quote = pipeline.queue("quote")
+            all_raw_articles: List[Dict] = []
+            poll_context_ready = asyncio.Event()
+
+            # Resumed items: still waiting for AI, enriched but not written, or done
+            pending = [item.raw for item in resumed.values() if item.state in (PENDING, CLAIMED)]
+            enriched = [(item.raw, item.ai_result) for item in resumed.values() if item.state == ENRICHED]
+            written_before = {item.url: item.article_id for item in resumed.values() if item.state == WRITTEN}
+            near_dup = NearDupIndex(self.db)
+            if resumed:
+                run_metadata["checkpoint"] = {"pending": len(pending), "enriched": len(enriched), "written": len(written_before)}
+                # Their signatures may not have been stored before the interruption
+                near_dup.sign([item.raw for item in resumed.values() if item.state in (ENRICHED, WRITTEN)])
+
+            slugs = {raw['url']: slugify(raw['title']) for raw in pending + [raw for raw, _ in enriched]}
+            taken_slugs = existing_values(self.db, Article.slug, list(slugs.values()))
+
+            # Items whose AI processing failed; they stay pending in the checkpoint
+            unprocessed_urls: List[str] = []
+            flushed_urls = []
+            def on_flush(inserted):
+                checkpoint.flush(inserted)
+                flushed_urls.extend(inserted)
+            # Its own session: the stages share self.db, and a failed batch's rollback must not
+            # throw away what another stage has pending
+            writer = ArticleWriter(SessionLocal(), on_flush=on_flush)
+            budget = TokenBudget(settings.AI_RUN_TOKEN_BUDGET, settings.AI_DAILY_TOKEN_BUDGET, tokens_spent_today(self.db))
+            ai_stage = AIStage(budget=budget)
+            cache_before = llm_cache.stats()
+
+            if work_queue:
+                # Resumed items that were waiting or not yet written go back to the workers
+                # (enriched ones keep their AI result and are only written)
+                work_queue.requeue([raw['url'] for raw in pending] + [raw['url'] for raw, _ in enriched])
+                run_metadata["work_queue"] = {"workers": workers, "closed": False}
+                self._save_progress(log_entry, run_metadata)
+                processes = await spawn_workers(log_entry.id, workers)
+
+            async def fetch_stage():
+                # 1. Fetch from sources (one pooled HTTP client for the whole run)
+                # Feeds unchanged since the last run come back empty and are not re-parsed
+                nonlocal feed_cache
+                meter = pipeline.meter("fetch")
+
+                async def emit(chunk):
+                    meter.count(len(chunk))
+                    all_raw_articles.extend(chunk)
+                    if not resumed:
+                        checkpoint.save_fetched(chunk)
+                    if len(all_raw_articles) >= POLL_CONTEXT_ARTICLES:
+                        poll_context_ready.set()
+                    await fetched.put(chunk)
+
+                if saved_items:
+                    # Resumed or replayed: the fetched batch is in the checkpoint
+                    await emit([item.raw for item in saved_items])
+                else:
+                    feed_cache = FeedCache(self.db)
+                    async with fetcher.session(feed_cache=feed_cache) as http:
+                        async for chunk in registry.fetch_stream(fetcher, sources):
+                            await emit(chunk)
+                    registry.mark_polled(sources)
+                    run_metadata["http_pool"] = http.stats()
+                    run_metadata["feed_cache"] = feed_cache.stats()
+                    if fetcher.last_rss_stats:
+                        run_metadata["rss"] = fetcher.last_rss_stats
+                    run_metadata["fetch_latency"] = latency_summary(r["latency"] for r in fetcher.source_results.values())
+                meter.finish()
+                poll_context_ready.set()
+                await fetched.close()
+                self._save_progress(log_entry, run_metadata)
+
+            async def dedup_stage():
+                # 2. Deduplicate each chunk before any AI work
+                # One set-based URL lookup per chunk (URLs confirmed earlier in the run are answered by the Bloom filter)
+                meter = pipeline.meter("dedup")
+                dedup = run_metadata["dedup"] = {"candidates": 0, "unique_urls": 0, "already_ingested": 0, "new": 0, "url_queries": 0}
+                for raw in pending:
+                    await to_enrich.put(raw)
+                # Items a resumed run already deduplicated keep their verdict
+                seen = {url for url, item in resumed.items() if item.state != FETCHED}
+                async for chunk in fetched:
+                    candidates = {}
+                    for raw in chunk:
+                        url = raw.get('url')
+                        if url and url not in seen:
+                            candidates.setdefault(url, raw)
+                    seen.update(candidates)
+                    queries_before = url_deduplicator.queries
+                    known_urls = url_deduplicator.known_urls(self.db, list(candidates))
+                    new_raw_articles = [raw for url, raw in candidates.items() if url not in known_urls]
+
+                    # 2b. Drop stories that retell one already in this run or stored recently
+                    if settings.NEAR_DUP_ENABLED:
+                        new_raw_articles = near_dup.filter(new_raw_articles)
+                    new_urls = {raw['url'] for raw in new_raw_articles}
+                    checkpoint.mark(list(new_urls), PENDING)
+                    checkpoint.mark([url for url in candidates if url not in new_urls], SKIPPED)
+
+                    # Slugs for the new articles are checked in one query as well
+                    chunk_slugs = {raw['url']: slugify(raw['title']) for raw in new_raw_articles}
+                    slugs.update(chunk_slugs)
+                    taken_slugs.update(existing_values(self.db, Article.slug, list(chunk_slugs.values())))
+
+                    dedup["candidates"] += len(chunk)
+                    dedup["unique_urls"] += len(candidates)
+                    dedup["already_ingested"] += len(known_urls)
+                    dedup["new"] += len(new_raw_articles)
+                    dedup["url_queries"] += url_deduplicator.queries - queries_before
+                    meter.count(len(chunk))
+                    for raw in new_raw_articles:
+                        await to_enrich.put(raw)
+                meter.finish()
+                await to_enrich.close()
+
+            async def enrich_stage():
+                # 3. AI Processing (bounded concurrency, async provider clients; results arrive as they finish)
+                meter = pipeline.meter("enrich")
+                for item in enriched:
+                    await to_write.put(item)
+                async for raw, ai_result in ai_stage.process_stream(to_enrich):
+                    meter.count()
+                    if ai_result is None:
+                        unprocessed_urls.append(raw['url'])
+                        continue
+                    checkpoint.add_result(raw, ai_result)
+                    await to_write.put((raw, ai_result))
+                meter.finish()
+                await to_write.close()
+
+            async def write_stage():
+                meter = pipeline.meter("write")
+                # Quotes came back with the enrichment call; they move on once their article is written
+                quotes = {}
+                async def forward_quotes():
+                    while flushed_urls:
+                        url = flushed_urls.pop()
+                        if url in quotes:
+                            await to_quote.put(quotes.pop(url))
+
+                for item in resumed.values():
+                    if item.state == WRITTEN and (item.ai_result or {}).get('quote'):
+                        await to_quote.put((item.raw, item.ai_result['quote']))
+
+                # A partial batch is flushed on a timer while enrichment is slow to deliver
+                async with writer.timed_flushes():
+                    async for raw, ai_result in to_write:
+                        # The enrichment call also returns the article's quote, if it has one
+                        if ai_result.get('quote'):
+                            quotes[raw['url']] = (raw, ai_result['quote'])
+
+                        try:
+                            # 4. Normalization; buffered, written in batches by ArticleWriter
+                            writer.add(article_row(raw, ai_result, slugs[raw['url']], taken_slugs))
+                        except Exception as loop_e:
+                            logger.error(f"Failed to process article {raw['title']}: {loop_e}")
+                            writer.db.rollback()
+                        meter.count()
+                        await forward_quotes()
+
+                writer.close()
+                checkpoint.flush()
+                await forward_quotes()
+                run_metadata["writes"] = writer.stats()
+                near_dup.record({**written_before, **writer.inserted_urls})
+                run_metadata["near_dup"] = near_dup.stats()
+                meter.finish()
+                await to_quote.close()
+                self._save_progress(log_entry, run_metadata)
+
+            async def shard_stage():
+                # 3-4. Sharded: the new items are pending in the work queue, where worker
+                # processes claim, enrich and write them; wait for the queue to drain
+                from app.services.ingestion_worker import run_worker
+                meter = pipeline.meter("workers")
+                async for _ in to_enrich:
+                    meter.count()
+                run_metadata["work_queue"]["closed"] = True
+                self._save_progress(log_entry, run_metadata)
+                # Workers that all died leave claimable items; finish them here
+                while await work_queue.wait(processes):
+                    logger.warning("Ingestion workers exited with items left, processing them in-process")
+                    await run_worker(log_entry.id)
+                await asyncio.gather(*(p.wait() for p in processes))
+                run_metadata["work_queue"]["exit_codes"] = [p.returncode for p in processes]
+
+                for item in checkpoint.load():
+                    if item.state in (PENDING, CLAIMED):
+                        unprocessed_urls.append(item.url)
+                    if item.state == WRITTEN:
+                        written_before[item.url] = item.article_id
+                        if (item.ai_result or {}).get('quote'):
+                            await to_quote.put((item.raw, item.ai_result['quote']))
+                self._keep_worker_stats(log_entry, run_metadata)
+                run_metadata.update(merge_worker_stats(run_metadata.get("workers") or {}))
+                near_dup.record(written_before)
+                run_metadata["near_dup"] = near_dup.stats()
+                meter.finish()
+                await to_quote.close()
+                self._save_progress(log_entry, run_metadata)
+
+            async def quote_stage():
+                # 6. Save Quotes from Interviews/Speeches (Updated Feature)
+                # Only articles actually written by this run count. The enrichment prompt only asked
+                # for a quote where the quote prefilter expects one (see AIStage)
+                from app.db.models import Quote
+                meter = pipeline.meter("quote")
+                found = duplicates = saved = 0
+                existing_quotes = set()
+                while batch := await to_quote.get_batch(settings.ARTICLE_WRITE_BATCH_SIZE):
+                    found += len(batch)
+                    meter.count(len(batch))
+                    # Check duplicate text for the batch's quotes in one query
+                    existing_quotes |= existing_values(self.db, Quote.text, [q['text'] for _, q in batch])
+                    for raw, quote_data in batch:
+                        if quote_data['text'] in existing_quotes:
+                            duplicates += 1
+                            continue
+                        try:
+                            # Fallback avatar logic -> Wiki or None (frontend handles fallbacks)
+                            q = Quote(
+                                text=quote_data['text'],
+                                author=quote_data['author'],
+                                role=quote_data.get('role'),
+                                source_url=raw['url']
+                            )
+                            self.db.add(q)
+                            self.db.commit()
+                            existing_quotes.add(quote_data['text'])
+                            saved += 1
+                            logger.info(f"Extracted Quote from {quote_data['author']}")
+                        except Exception as e:
+                            logger.error(f"Failed to save quote for {raw['title']}: {e}")
+                            self.db.rollback()
+                run_metadata["quotes"] = {"found": found, "duplicates": duplicates, "saved": saved}
+                meter.finish()
+
+            async def poll_stage():
+                # 5. Generate Daily Poll if anything was fetched, to keep it fresh based on feed
+                # Starts as soon as the first articles for its context are in, alongside the rest
+                # Sources are polled on their own cadence, so only refresh the poll every POLL_REFRESH_HOURS
+                # Out of token budget: keep the current poll rather than spend more
+                meter = pipeline.meter("poll")
+                await poll_context_ready.wait()
+                if all_raw_articles and self._poll_is_stale() and not ai_stage.over_budget():
+                    logger.info("Generating Daily Poll...")
+                    meter.count()
                     try:
-                        # Use full content if available, else snippet
-                        content_scan = raw.get('content') or raw.get('summary') or raw['title']
-                        quote_data = ai_service.extract_quote(content_scan)
+                        # Context from the first articles fetched
+                        context_articles = all_raw_articles[:POLL_CONTEXT_ARTICLES]
+                        context_text = "\n".join([f"- {a['title']}: {a.get('content', '')[:100]}..." for a in context_articles])
                         
-                        if quote_data and quote_data.get('found'):
-                            # Check duplicate text
-                            exists = self.db.query(Quote).filter(Quote.text == quote_data['text']).first()
-                            if not exists:
-                                # Fallback avatar logic -> Wiki or None (frontend handles fallbacks)
-                                q = Quote(
-                                    text=quote_data['text'],
-                                    author=quote_data['author'],
-                                    role=quote_data.get('role'),
-                                    source_url=raw['url']
-                                )
-                                self.db.add(q)
-                                self.db.commit()
-                                logger.info(f"Extracted Quote from {quote_data['author']}")
-                    except Exception as e:
-                        logger.error(f"Quote extraction failed for {raw['title']}: {e}")
-
-            # 5. Generate Daily Poll if new articles were added (or even if not, to keep it fresh based on feed)
-            if new_articles_count > 0 or len(all_raw_articles) > 0:
-                logger.info("Generating Daily Poll...")
-                try:
-                    # Context from top 5 articles
-                    context_articles = all_raw_articles[:5]
-                    context_text = "\n".join([f"- {a['title']}: {a.get('content', '')[:100]}..." for a in context_articles])
-                    
-                    poll_data = ai_service.generate_poll(context_text)
-                    
-                    if poll_data:
-                        from app.db.models import Poll
-                        # Deactivate old polls
-                        self.db.query(Poll).update({Poll.is_active: False})
+                        poll_data = await ai_service.generate_poll(context_text)
                         
-                        # Create new poll
-                        new_poll = Poll(
-                            question=poll_data.get("question", "What is the most exciting tech today?"),
-                            options=poll_data.get("options", []),
-                            is_active=True
-                        )
-                        self.db.add(new_poll)
-                        self.db.commit()
-                        logger.info(f"Created new Daily Poll: {new_poll.question}")
-                except Exception as poll_e:
-                    logger.error(f"Failed to generate daily poll: {poll_e}")
-                    # Don't fail the whole job
-            
+                        if poll_data:
+                            from app.db.models import Poll
+                            # Deactivate old polls
+                            self.db.query(Poll).update({Poll.is_active: False})
+                            
+                            # Create new poll
+                            new_poll = Poll(
+                                question=poll_data.get("question", "What is the most exciting tech today?"),
+                                options=poll_data.get("options", []),
+                                is_active=True
+                            )
+                            self.db.add(new_poll)
+                            self.db.commit()
+                            logger.info(f"Created new Daily Poll: {new_poll.question}")
+                    except Exception as poll_e:
+                        logger.error(f"Failed to generate daily poll: {poll_e}")
+                        # Don't fail the whole job
+                meter.finish()
+
+            logger.info("Running ingestion stages...")
+            if work_queue:
+                stages = [fetch_stage(), dedup_stage(), shard_stage(), quote_stage(), poll_stage()]
+            else:
+                stages = [fetch_stage(), dedup_stage(), enrich_stage(), write_stage(), quote_stage(), poll_stage()]
+            await pipeline.run(*stages)
+            new_articles_count = len(written_before) + writer.inserted
+            run_metadata["stages"] = pipeline.seconds()
+            run_metadata["pipeline"] = pipeline.stats()
+            if not work_queue:
+                run_metadata["ai"] = ai_stage.stats()
+            run_metadata["llm_cache"] = llm_cache.stats_since(cache_before)
+            llm_cache.prune()
+
+            RunCheckpoint.prune(self.db)
+
+            # Remember feed validators for next run, except for feeds with unprocessed items,
+            # which would otherwise come back unchanged and never be parsed again
+            if feed_cache:
+                feed_cache.save(unprocessed_urls)
+                run_metadata["feed_cache"]["held_back"] = feed_cache.held_back
+
             # Update Log
-            log_entry.status = "SUCCESS"
+            # Items still pending (AI failed, or out of claim attempts) keep the run PARTIAL,
+            # so --resume and auto-resume pick them up instead of losing them
+            self._keep_worker_stats(log_entry, run_metadata)
+            run_metadata["unprocessed"] = len(unprocessed_urls)
+            if unprocessed_urls:
+                log_entry.status = "PARTIAL"
+                log_entry.errors = f"{len(unprocessed_urls)} items left unprocessed; resume the run to retry them"
+            else:
+                log_entry.status = "SUCCESS"
+                log_entry.errors = None
             log_entry.articles_added = new_articles_count
+            log_entry.job_metadata = run_metadata
             self.db.commit() # Commit log
+            if unprocessed_urls:
+                logger.warning(f"Ingestion run {log_entry.id} left {len(unprocessed_urls)} items unprocessed, kept PARTIAL for --resume.")
             logger.info(f"Ingestion complete. Added {new_articles_count} articles.")
 
         except Exception as e:
             logger.error(f"Ingestion failed: {e}")
             self.db.rollback()
+            self._keep_worker_stats(log_entry, run_metadata)
             log_entry.status = "FAILURE"
             log_entry.errors = str(e)
+            log_entry.job_metadata = run_metadata
             self.db.commit()
+        finally:
+            # Workers stop on their own once the run is no longer PARTIAL; don't leave them running if this was cancelled
+            for process in processes:
+                if process.returncode is None:
+                    process.terminate()
+            if writer:
+                writer.db.close()
+        return log_entry
+
+    def _save_progress(self, log_entry: IngestionLog, run_metadata: dict):
+        """Commits the metadata gathered so far, so an interrupted run shows how far it got."""
+        self._keep_worker_stats(log_entry, run_metadata)
+        log_entry.job_metadata = copy.deepcopy(run_metadata)
+        flag_modified(log_entry, "job_metadata")
+        self.db.commit()
+
+    def _keep_worker_stats(self, log_entry: IngestionLog, run_metadata: dict):
+        """Sharded runs: workers add their stats to the log row, so reload them (row-locked) before it is overwritten."""
+        if "work_queue" in run_metadata:
+            self.db.refresh(log_entry, with_for_update=True)
+            run_metadata["workers"] = (log_entry.job_metadata or {}).get("workers") or {}
+
+    def _poll_is_stale(self) -> bool:
+        from app.db.models import Poll
+        latest = self.db.query(Poll).filter(Poll.is_active == True).order_by(Poll.created_at.desc()).first()
+        if not latest or not latest.created_at:
+            return True
+        created_at = latest.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - created_at >= timedelta(hours=settings.POLL_REFRESH_HOURS)
+
+async def run_ingestion_job(due_only: bool = False, source_ids: Optional[List[str]] = None,
+                            resume_run_id: Optional[str] = None, replay_run_id: Optional[str] = None,
+                            auto_resume: bool = False, workers: Optional[int] = None):
+    """
+    `resume_run_id="latest"` resumes the most recent interrupted run. With
+    `auto_resume` (scheduler ticks), an interrupted run from the last
+    INGESTION_AUTO_RESUME_HOURS is finished before the regular run.
+
+    Only one worker runs ingestion at a time (API workers, replicas, the
+    scheduler worker and cron runs share a lease), so while it holds the
+    lease any PARTIAL run really was interrupted or left items unprocessed
+    (see run_pipeline); a run whose lease is lost
+    is stopped (LeaseLost) and left PARTIAL for the next leader to resume.
+    Without the lease table another worker's PARTIAL run may still be going,
+    so `auto_resume` is off. `workers` (default
+    INGESTION_WORKERS) shards the run across worker processes; they do not
+    take the lease, the run holding it coordinates them.
+    """
+    if workers is None:
+        workers = settings.INGESTION_WORKERS
+    async with leader_lease(INGESTION_LEASE) as is_leader:
+        if is_leader is False:
+            logger.info("Another worker is running ingestion, skipping this run.")
+            return
+        if is_leader is None and auto_resume:
+            logger.info("No ingestion lease, not resuming interrupted runs (another worker may own them).")
+            auto_resume = False
+        db = SessionLocal()
+        try:
+            service = IngestionService(db)
+            if resume_run_id == "latest":
+                interrupted = interrupted_run(db, settings.INGESTION_CHECKPOINT_RETENTION_DAYS * 24)
+                if not interrupted:
+                    logger.info("No interrupted ingestion run to resume.")
+                    return
+                resume_run_id = interrupted.id
+            elif auto_resume and settings.INGESTION_AUTO_RESUME_HOURS:
+                interrupted = interrupted_run(db, settings.INGESTION_AUTO_RESUME_HOURS)
+                if interrupted:
+                    await service.run_pipeline(resume_run_id=interrupted.id, workers=workers)
 
-async def run_ingestion_job():
-    db = SessionLocal()
-    try:
-        service = IngestionService(db)
-        await service.run_pipeline()
-    finally:
-        db.close()
+            if resume_run_id or replay_run_id:
+                await service.run_pipeline(resume_run_id=resume_run_id, replay_run_id=replay_run_id, workers=workers)
+            else:
+                await service.run_pipeline(due_only=due_only, source_ids=source_ids, workers=workers)
+        finally:
+            db.close()
 
 if __name__ == "__main__":
-    import asyncio
     logging.basicConfig(level=logging.INFO)
     asyncio.run(run_ingestion_job())
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+from app.core.config import settings
+from app.db.models import Article, IngestionLog
+from app.db.session import SessionLocal
+from app.services.ai import ai_service
+from app.services.ai_stage import AIStage
+from app.services.article_writer import ArticleWriter
+from app.services.checkpoint import RunCheckpoint
+from app.services.dedup import existing_values
+from app.services.ingestion import article_row, slugify, tokens_spent_today
+from app.services.pipeline import Pipeline
+from app.services.rate_limit import TokenBucket, TokenBudget
+from app.services.work_queue import CLAIM_POLL_SECONDS, WorkQueue, open_run
+
+logger = logging.getLogger(__name__)
+
+async def run_worker(run_id, worker: Optional[str] = None, share_rate_limit: bool = False) -> Optional[dict]:
+    """
+    Enriches and writes items of sharded run `run_id` until its work queue is
+    closed and empty, then adds its stats to the run's IngestionLog. Started by
+    the coordinator (`run_ingestion.py --workers N`) or by hand on other hosts
+    (`run_ingestion.py --worker RUN_ID`). Returns the stats.
+
+    The run's token budget and what is left of the daily one are split
+    between its workers; with `share_rate_limit` (a dedicated worker process)
+    so is AI_RATE_LIMIT_RPM, which is otherwise enforced per process.
+    """
+    db = SessionLocal()
+    try:
+        run_id = uuid.UUID(str(run_id))
+        log_entry = db.get(IngestionLog, run_id)
+        if not log_entry or log_entry.status != "PARTIAL":
+            logger.info(f"Run {run_id} is not in progress, nothing to work on.")
+            return None
+        queue = WorkQueue(db, run_id, worker)
+        logger.info(f"Worker {queue.worker} joining ingestion run {run_id}")
+
+        workers = ((log_entry.job_metadata or {}).get("work_queue") or {}).get("workers") or 1
+        if share_rate_limit and settings.AI_RATE_LIMIT_RPM:
+            ai_service.limiter = TokenBucket(settings.AI_RATE_LIMIT_RPM / workers, settings.AI_RATE_LIMIT_BURST // workers)
+        budget = TokenBudget(settings.AI_RUN_TOKEN_BUDGET, settings.AI_DAILY_TOKEN_BUDGET, tokens_spent_today(db)).split(workers)
+        ai_stage = AIStage(budget=budget)
+        checkpoint = RunCheckpoint(db, run_id)
+        writer = ArticleWriter(db, on_flush=checkpoint.flush)
+
+        pipeline = Pipeline(settings.PIPELINE_QUEUE_SIZE)
+        # Claimed items wait here; kept small so the rest stays claimable by idle workers
+        to_enrich = pipeline.queue("enrich", settings.AI_BATCH_SIZE * ai_stage.concurrency)
+        to_write = pipeline.queue("write")
+        slugs, taken_slugs, failed_urls = {}, set(), []
+
+        async def claim_stage():
+            meter = pipeline.meter("claim")
+            closed = False
+            while True:
+                items = queue.claim(settings.AI_BATCH_SIZE)
+                if not items:
+                    # Once the queue is closed, claim once more: the last items may have come in just before
+                    if closed:
+                        break
+                    closed = not queue.is_open()
+                    if not closed:
+                        await asyncio.sleep(CLAIM_POLL_SECONDS)
+                    continue
+                meter.count(len(items))
+                chunk_slugs = {item.url: slugify(item.raw['title']) for item in items}
+                slugs.update(chunk_slugs)
+                taken_slugs.update(existing_values(db, Article.slug, list(chunk_slugs.values())))
+                for item in items:
+                    # Enriched by an earlier claim (or before a resume); only the write is left
+                    if item.ai_result:
+                        await to_write.put((item.raw, item.ai_result))
+                    else:
+                        await to_enrich.put(item.raw)
+            meter.finish()
+            await to_enrich.close()
+
+        async def enrich_stage():
+            meter = pipeline.meter("enrich")
+            async for raw, ai_result in ai_stage.process_stream(to_enrich):
+                meter.count()
+                if ai_result is None:
+                    failed_urls.append(raw['url'])
+                    continue
+                checkpoint.add_result(raw, ai_result)
+                await to_write.put((raw, ai_result))
+            meter.finish()
+            await to_write.close()
+
+        async def write_stage():
+            meter = pipeline.meter("write")
+            async with writer.timed_flushes():
+                async for raw, ai_result in to_write:
+                    try:
+                        writer.add(article_row(raw, ai_result, slugs[raw['url']], taken_slugs))
+                    except Exception as e:
+                        logger.error(f"Failed to process article {raw['title']}: {e}")
+                        db.rollback()
+                    meter.count()
+            writer.close()
+            checkpoint.flush()
+            # Another worker gets a go at items whose AI call failed
+            queue.release(failed_urls)
+            meter.finish()
+
+        heartbeat = asyncio.ensure_future(queue.keep_claims())
+        try:
+            await pipeline.run(claim_stage(), enrich_stage(), write_stage())
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        stats = {
+            "claimed": queue.claimed,
+            "released": len(failed_urls),
+            "ai": ai_stage.stats(),
+            "writes": writer.stats(),
+            "pipeline": pipeline.stats(),
+        }
+        queue.report(stats)
+        logger.info(f"Worker {queue.worker} done: claimed {queue.claimed}, wrote {writer.inserted} articles")
+        return stats
+    finally:
+        db.close()
+
+async def join_run(run_id: str = "latest") -> Optional[dict]:
+    """run_worker() for `run_id`, or for the most recent sharded run in progress with "latest"."""
+    if run_id == "latest":
+        db = SessionLocal()
+        try:
+            log_entry = open_run(db)
+        finally:
+            db.close()
+        if not log_entry:
+            logger.info("No sharded ingestion run in progress.")
+            return None
+        run_id = log_entry.id
+    return await run_worker(run_id, share_rate_limit=True)
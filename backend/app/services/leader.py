@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.core.config import settings
+from app.db.models import SchedulerLease
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class LeaseLost(RuntimeError):
+    """The job's lease could not be kept; the job was stopped so another worker can take it over."""
+
+class JobLease:
+    """
+    Time-limited lease on a named job, stored in the scheduler_leases table.
+
+    Acquiring is one upsert that only takes the row over if it is expired (or
+    already ours), so of several workers ticking at once exactly one wins.
+    Times come from the database clock, so worker clock skew does not matter.
+    A crashed holder blocks the job for at most `ttl_seconds`.
+
+    A lease row rather than pg_advisory_lock: session-level advisory locks
+    are not safe behind a transaction-mode pooler (Supabase's pgbouncer).
+    """
+
+    def __init__(self, name: str, ttl_seconds: Optional[int] = None):
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds or settings.LEADER_LEASE_SECONDS)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self) -> Optional[bool]:
+        """True if the lease is now ours, False if another worker holds it, None if leases are unavailable."""
+        stmt = (
+            pg_insert(SchedulerLease)
+            .values(name=self.name, holder=self.holder, acquired_at=func.now(), expires_at=func.now() + self.ttl)
+            .on_conflict_do_update(
+                index_elements=[SchedulerLease.name],
+                set_={"holder": self.holder, "acquired_at": func.now(), "expires_at": func.now() + self.ttl},
+                where=(SchedulerLease.expires_at < func.now()) | (SchedulerLease.holder == self.holder),
+            )
+            .returning(SchedulerLease.holder)
+        )
+        db = SessionLocal()
+        try:
+            won = db.execute(stmt).first() is not None
+            db.commit()
+            return won
+        except Exception as e:
+            # Table missing (database/14_scheduler_lease_schema.sql not applied yet)
+            logger.warning(f"Job lease '{self.name}' unavailable: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def renew(self) -> Optional[bool]:
+        """True if renewed, False if the lease is no longer ours, None if the renewal failed (DB error)."""
+        db = SessionLocal()
+        try:
+            renewed = (
+                db.query(SchedulerLease)
+                .filter(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder)
+                .update({SchedulerLease.expires_at: func.now() + self.ttl}, synchronize_session=False)
+            )
+            db.commit()
+            return renewed == 1
+        except Exception as e:
+            logger.error(f"Failed to renew job lease '{self.name}': {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def release(self):
+        db = SessionLocal()
+        try:
+            db.query(SchedulerLease).filter(
+                SchedulerLease.name == self.name, SchedulerLease.holder == self.holder
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            # Expires on its own
+            logger.error(f"Failed to release job lease '{self.name}': {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    async def keep_alive(self, on_lost: Callable[[], None]):
+        """
+        Renews the lease every third of its ttl. Calls `on_lost` once it is
+        gone: taken over, or not renewed for two thirds of the ttl (DB errors),
+        which stops the job before the lease expires and another worker can
+        take it.
+        """
+        ttl = self.ttl.total_seconds()
+        renewed_at = time.monotonic()
+        while True:
+            await asyncio.sleep(ttl / 3)
+            renewed = self.renew()
+            if renewed:
+                renewed_at = time.monotonic()
+                continue
+            if renewed is False or time.monotonic() - renewed_at >= ttl * 2 / 3:
+                logger.error(f"Lost job lease '{self.name}', stopping the job")
+                on_lost()
+                return
+
+@asynccontextmanager
+async def leader_lease(name: str, ttl_seconds: Optional[int] = None) -> AsyncIterator[Optional[bool]]:
+    """
+    Yields True if this worker should run job `name` (it holds the lease,
+    renewed until the block exits), False if another worker is running it,
+    None if leases are unavailable (no scheduler_leases table): every worker
+    runs the job, as before, but cannot assume it is the only one.
+
+    If the lease is lost while the block runs, the task running it is
+    cancelled and the block raises LeaseLost, so two workers never run the
+    job at the same time.
+    """
+    lease = JobLease(name, ttl_seconds)
+    acquired = lease.acquire()
+    if acquired is None:
+        yield None
+        return
+    if not acquired:
+        yield False
+        return
+
+    owner = asyncio.current_task()
+    lost = False
+    def stop():
+        nonlocal lost
+        lost = True
+        owner.cancel()
+
+    heartbeat = asyncio.create_task(lease.keep_alive(stop))
+    try:
+        yield True
+    except asyncio.CancelledError:
+        if not lost:
+            raise
+        # Python 3.11+ counts cancel requests; 3.10 has no counter to undo
+        if hasattr(owner, "uncancel"):
+            owner.uncancel()
+        raise LeaseLost(f"Lost job lease '{name}'")
+    finally:
+        heartbeat.cancel()
+        if not lost:
+            lease.release()
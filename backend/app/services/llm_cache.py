@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from app.core.config import settings
+from app.db.models import LLMCacheEntry
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r"\s+")
+DB_RETRY_SECONDS = 300
+
+def normalize_content(text: str) -> str:
+    """Case, Unicode form and whitespace differences should not defeat the cache."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+def cache_key(task: str, model: str, prompt_version: int, content: str) -> str:
+    content_hash = hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{task}|{model}|v{prompt_version}|{content_hash}".encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Two-tier cache of parsed LLM responses.
+
+    An in-memory LRU (LLM_CACHE_MEMORY_ITEMS) sits in front of the llm_cache table,
+    so repeat runs, retries and syndicated copies of a story skip the provider.
+    Entries expire after LLM_CACHE_TTL_HOURS; prune() trims the table to
+    LLM_CACHE_MAX_ROWS. Async callers use get_async()/put_async(), which keep the
+    DB round trip off the event loop.
+    """
+
+    def __init__(self):
+        self.enabled = settings.LLM_CACHE_ENABLED
+        self.db_retry_at = 0.0 # DB tier is skipped until then after an error
+        self.ttl = timedelta(hours=settings.LLM_CACHE_TTL_HOURS)
+        self.memory_items = settings.LLM_CACHE_MEMORY_ITEMS
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _remember(self, key: str, value: dict, expires_at: float):
+        with self.lock:
+            self.memory[key] = (value, expires_at)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_items:
+                self.memory.popitem(last=False)
+
+    @property
+    def db_enabled(self) -> bool:
+        return time.time() >= self.db_retry_at
+
+    def _disable_db(self, e: Exception):
+        logger.warning(f"LLM cache DB tier unavailable, memory only for {DB_RETRY_SECONDS}s: {e}")
+        self.db_retry_at = time.time() + DB_RETRY_SECONDS
+
+    def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        value = self._memory_get(key)
+        return value if value is not None else self._db_get(key)
+
+    async def get_async(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        value = self._memory_get(key)
+        return value if value is not None else await asyncio.to_thread(self._db_get, key)
+
+    def _memory_get(self, key: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry and entry[1] > time.time():
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry:
+                del self.memory[key]
+        return None
+
+    def _db_get(self, key: str) -> Optional[dict]:
+        if self.db_enabled:
+            db = SessionLocal()
+            try:
+                row = db.query(LLMCacheEntry).filter(
+                    LLMCacheEntry.key == key,
+                    LLMCacheEntry.expires_at > datetime.now(timezone.utc)
+                ).first()
+                if row:
+                    row.hits = (row.hits or 0) + 1
+                    value, expires_at = row.response, row.expires_at.timestamp()
+                    db.commit()
+                    self._remember(key, value, expires_at)
+                    with self.lock:
+                        self.db_hits += 1
+                    return value
+            except Exception as e:
+                self._disable_db(e)
+            finally:
+                db.close()
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, task: str, model: str, value: dict):
+        if not self.enabled:
+            return
+        expires_at = datetime.now(timezone.utc) + self.ttl
+        self._remember(key, value, expires_at.timestamp())
+        with self.lock:
+            self.writes += 1
+
+        if self.db_enabled:
+            db = SessionLocal()
+            try:
+                db.merge(LLMCacheEntry(key=key, task=task, model=model, response=value, expires_at=expires_at))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._disable_db(e)
+            finally:
+                db.close()
+
+    async def put_async(self, key: str, task: str, model: str, value: dict):
+        await asyncio.to_thread(self.put, key, task, model, value)
+
+    def prune(self):
+        """Deletes expired rows, then the oldest rows beyond LLM_CACHE_MAX_ROWS."""
+        if not self.enabled or not self.db_enabled:
+            return
+        db = SessionLocal()
+        try:
+            db.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= func.now()).delete(synchronize_session=False)
+            total = db.query(func.count(LLMCacheEntry.key)).scalar() or 0
+            excess = total - settings.LLM_CACHE_MAX_ROWS
+            if excess > 0:
+                oldest = db.query(LLMCacheEntry.key).order_by(LLMCacheEntry.created_at).limit(excess).subquery()
+                db.query(LLMCacheEntry).filter(LLMCacheEntry.key.in_(oldest.select())).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"LLM cache prune failed: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.memory_hits + self.db_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_ratio": round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def stats_since(self, before: dict) -> dict:
+        """Counter deltas since an earlier stats() snapshot (one ingestion run)."""
+        now = self.stats()
+        delta = {k: now[k] - before.get(k, 0) for k in ("memory_hits", "db_hits", "misses", "writes")}
+        lookups = delta["memory_hits"] + delta["db_hits"] + delta["misses"]
+        delta["hit_ratio"] = round((delta["memory_hits"] + delta["db_hits"]) / lookups, 3) if lookups else 0.0
+        return delta
+
+llm_cache = LLMCache()
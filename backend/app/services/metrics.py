@@ -0,0 +1,18 @@
+import math
+from typing import Dict, Iterable, List
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def latency_summary(seconds: Iterable[float]) -> Dict:
+    """Count, p50 and p95 (in ms) of a set of latencies given in seconds."""
+    samples = sorted(seconds)
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+    }
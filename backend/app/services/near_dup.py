@@ -0,0 +1,252 @@
+import hashlib
+import logging
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Article, ArticleDuplicate, ArticleSignature
+from app.services.dedup import url_deduplicator
+from app.services.text_prep import clean_text, strip_boilerplate
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16 # 16 bands x 4 rows: pairs at 0.6 similarity share a band ~89% of the time, at 0.3 ~12%
+ROWS_PER_BAND = NUM_PERM // BANDS
+PRIME = 4294967311 # Smallest prime above 2**32; (a * x + b) stays below 2**64 for 32-bit a and x
+
+SHINGLE_SIZE = 3
+SHORT_TEXT_WORDS = 30 # Below this (headline-only items) only an identical normalized title matches
+LEDE_WORDS = 60 # Syndicated copies share the opening; it also fits in the stored 500-char snippet
+WORD_PATTERN = re.compile(r"\w+")
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little")
+
+# Permutations derived from fixed strings, not an RNG: stored signatures must stay
+# comparable across processes and library upgrades
+_A = np.array([_hash32(f"minhash-a-{i}") | 1 for i in range(NUM_PERM)], dtype=np.uint64)
+_B = np.array([_hash32(f"minhash-b-{i}") for i in range(NUM_PERM)], dtype=np.uint64)
+
+def story_words(title: str, content: str) -> List[str]:
+    """Title plus the opening of the body; bodies too short to say more than the title are left out."""
+    words = WORD_PATTERN.findall((title or "").lower())
+    body = WORD_PATTERN.findall(strip_boilerplate(clean_text(content)).lower())
+    if len(body) >= SHORT_TEXT_WORDS:
+        words += body
+    return words[:LEDE_WORDS]
+
+def shingles(words: Sequence[str]) -> Set[str]:
+    if not words:
+        return set()
+    if len(words) < SHORT_TEXT_WORDS:
+        # A headline is too short for overlap to mean much ("OpenAI releases GPT-5" and
+        # "... GPT-5 mini" share 4 of 5 words): the whole text is one shingle, so only an
+        # identical normalized title scores 1 and any other scores ~0
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def minhash(shingle_set: Set[str]) -> Optional[np.ndarray]:
+    """NUM_PERM minimum hashes of the set, one per (a * x + b) mod PRIME permutation."""
+    if not shingle_set:
+        return None
+    hashes = np.fromiter((_hash32(s) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    return ((np.outer(hashes, _A) + _B) % PRIME).min(axis=0)
+
+def band_keys(signature: np.ndarray) -> List[str]:
+    return [
+        f"{b}:{hashlib.blake2b(signature[b * ROWS_PER_BAND:(b + 1) * ROWS_PER_BAND].astype('<u8').tobytes(), digest_size=8).hexdigest()}"
+        for b in range(BANDS)
+    ]
+
+def similarity(signatures: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity (share of equal min-hashes) of every signatures x others row pair."""
+    return (signatures[:, None, :] == others[None, :, :]).mean(axis=2)
+
+class NearDupIndex:
+    """
+    Finds fetched items that retell a story already in the batch or stored in
+    the last NEAR_DUP_WINDOW_DAYS, before any AI work is spent on them.
+
+    Each article gets a MinHash signature over word shingles of its title and
+    opening; the signature is cut into BANDS band keys. Stored articles sharing
+    a band key with a candidate are found with one GIN-indexed overlap query,
+    and only those are compared. Duplicates are dropped from the run and
+    recorded in article_duplicates against their canonical article.
+    """
+
+    def __init__(self, db: Session, threshold: Optional[float] = None, window_days: Optional[int] = None):
+        self.db = db
+        self.threshold = threshold or settings.NEAR_DUP_THRESHOLD
+        self.window_days = window_days or settings.NEAR_DUP_WINDOW_DAYS
+        self.enabled = True
+
+        self.signatures: Dict[str, np.ndarray] = {}
+        # url -> (canonical article id or None, url of the canonical item if it is in this batch, similarity)
+        self.duplicates: Dict[str, Tuple[Optional[uuid.UUID], Optional[str], float]] = {}
+        self.raw_by_url: Dict[str, Dict] = {}
+        self.buckets: Dict[str, List[str]] = {} # Band key -> urls kept so far this run
+
+        self.checked = 0
+        self.compared = 0
+        self.batch_duplicates = 0
+        self.stored_duplicates = 0
+        self.recorded = 0
+
+    def sign(self, raw_articles: List[Dict]) -> List[str]:
+        """Computes signatures (stored by record() if the articles are written) without matching; returns the signed urls."""
+        signed = []
+        for raw in raw_articles:
+            signature = minhash(shingles(story_words(raw.get('title'), raw.get('content'))))
+            if signature is not None:
+                self.signatures[raw['url']] = signature
+                self.raw_by_url[raw['url']] = raw
+                signed.append(raw['url'])
+        return signed
+
+    def filter(self, raw_articles: List[Dict]) -> List[Dict]:
+        """
+        Returns the items of `raw_articles` that are not near-duplicates, in their
+        original order. Can be called once per chunk of a run: items are also
+        matched against those kept from earlier chunks.
+        """
+        signed = self.sign(raw_articles)
+        self.checked += len(raw_articles)
+        if not signed:
+            return list(raw_articles)
+
+        self._match_stored(signed)
+        self._match_batch([url for url in signed if url not in self.duplicates])
+        return [raw for raw in raw_articles if raw['url'] not in self.duplicates]
+
+    def _match_stored(self, urls: List[str]):
+        rows = self._candidate_rows({key for url in urls for key in band_keys(self.signatures[url])})
+        if not rows:
+            return
+        ids = [row.article_id for row in rows]
+        stored = np.array([row.minhash for row in rows], dtype=np.uint64)
+        scores = similarity(np.stack([self.signatures[url] for url in urls]), stored)
+        self.compared += scores.size
+        for i, url in enumerate(urls):
+            best = int(scores[i].argmax())
+            if scores[i, best] >= self.threshold:
+                self.duplicates[url] = (ids[best], None, round(float(scores[i, best]), 3))
+                self.stored_duplicates += 1
+
+    def _candidate_rows(self, keys: Set[str]) -> list:
+        if not self.enabled or not keys:
+            return []
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.window_days)
+        keys, rows = list(keys), {}
+        chunk = settings.DEDUP_QUERY_CHUNK
+        try:
+            for start in range(0, len(keys), chunk):
+                query = (
+                    self.db.query(ArticleSignature.article_id, ArticleSignature.minhash)
+                    .filter(ArticleSignature.bands.op("&&")(keys[start:start + chunk]), ArticleSignature.created_at >= cutoff)
+                )
+                rows.update((row.article_id, row) for row in query.all())
+        except Exception as e:
+            # Table missing (database/12_near_dup_schema.sql not applied yet)
+            logger.warning(f"Near-duplicate index disabled, could not query signatures: {e}")
+            self.db.rollback()
+            self.enabled = False
+            return []
+        return list(rows.values())
+
+    def _match_batch(self, urls: List[str]):
+        """Clusters the run's items; within a chunk the item with the longest content is kept as canonical."""
+        order = sorted(urls, key=lambda url: -len(self.raw_by_url[url].get('content') or ""))
+        buckets = self.buckets
+        for url in order:
+            keys = band_keys(self.signatures[url])
+            kept = list(dict.fromkeys(other for key in keys for other in buckets.get(key, [])))
+            if kept:
+                scores = similarity(self.signatures[url][None, :], np.stack([self.signatures[k] for k in kept]))[0]
+                self.compared += len(kept)
+                best = int(scores.argmax())
+                if scores[best] >= self.threshold:
+                    self.duplicates[url] = (None, kept[best], round(float(scores[best]), 3))
+                    self.batch_duplicates += 1
+                    continue
+            for key in keys:
+                buckets.setdefault(key, []).append(url)
+
+    def record(self, inserted_urls: Dict[str, uuid.UUID]):
+        """
+        Stores signatures of the articles written this run (`inserted_urls` maps
+        url -> article id) and attaches the skipped duplicates to their canonical
+        article. Duplicates of a batch item that was not written are dropped; they
+        are matched again on the next run.
+        """
+        if not self.enabled:
+            return
+        signatures = [
+            {"article_id": article_id, "minhash": self.signatures[url].tolist(), "bands": band_keys(self.signatures[url])}
+            for url, article_id in inserted_urls.items() if url in self.signatures
+        ]
+        duplicates = []
+        for url, (canonical_id, canonical_url, score) in self.duplicates.items():
+            canonical_id = canonical_id or inserted_urls.get(canonical_url)
+            if canonical_id is None:
+                continue
+            raw = self.raw_by_url[url]
+            duplicates.append(dict(url=url, canonical_id=canonical_id, title=raw['title'], source=raw['source'], similarity=score))
+
+        try:
+            if signatures:
+                self.db.execute(pg_insert(ArticleSignature).values(signatures).on_conflict_do_nothing())
+            if duplicates:
+                self.db.execute(pg_insert(ArticleDuplicate).values(duplicates).on_conflict_do_nothing())
+            self.db.commit()
+            self.recorded = len(duplicates)
+            # Recorded duplicates are skipped like stored URLs for the rest of the run
+            url_deduplicator.remember(d["url"] for d in duplicates)
+        except Exception as e:
+            logger.error(f"Failed to store near-duplicate signatures: {e}")
+            self.db.rollback()
+
+    def backfill(self, days: int, batch_size: int = 500) -> int:
+        """Signs stored articles from the window that have none yet (title + stored snippet)."""
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        signed = 0
+        while True:
+            rows = (
+                self.db.query(Article.id, Article.title, Article.original_snippet, Article.created_at)
+                .outerjoin(ArticleSignature, ArticleSignature.article_id == Article.id)
+                .filter(ArticleSignature.article_id.is_(None), Article.created_at >= cutoff)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                return signed
+            values = []
+            for row in rows:
+                # Unsignable rows (no words at all) get an empty signature so they are not revisited
+                signature = minhash(shingles(story_words(row.title, row.original_snippet)))
+                values.append({
+                    "article_id": row.id,
+                    "minhash": signature.tolist() if signature is not None else [],
+                    "bands": band_keys(signature) if signature is not None else [],
+                    "created_at": row.created_at, # Ages out of the window with its article
+                })
+            self.db.execute(pg_insert(ArticleSignature).values(values).on_conflict_do_nothing())
+            self.db.commit()
+            signed += len(values)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "checked": self.checked,
+            "signed": len(self.signatures),
+            "compared": self.compared,
+            "batch_duplicates": self.batch_duplicates,
+            "stored_duplicates": self.stored_duplicates,
+            "recorded": self.recorded,
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+# Shim cgi for Python 3.13+ (feedparser dependency).
+# Needed here too: worker processes import this module without going through app.main.
+import sys
+try:
+    import cgi
+except ImportError:
+    import types
+    import email.message
+
+    def parse_header(line):
+        if not line: return "", {}
+        m = email.message.Message()
+        m['Content-Type'] = line
+        return m.get_content_type(), dict(m.get_params() or [])
+
+    cgi = types.ModuleType("cgi")
+    cgi.parse_header = parse_header
+    sys.modules["cgi"] = cgi
+
+import feedparser
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Parsers ---
+# Module-level so they can be pickled into a process pool. They take raw feed
+# bytes and return plain dicts, so only small normalized data crosses back.
+
+def parse_arxiv_feed(content: bytes) -> List[Dict]:
+    feed = feedparser.parse(content)
+    papers = []
+    for entry in feed.entries:
+        papers.append({
+            "title": entry.title,
+            "url": entry.id,
+            "source": "Arxiv",
+            "content": entry.summary, # Abstract
+            "published_at": entry.published
+        })
+    return papers
+
+def parse_rss_feed(content: bytes, limit: int = 10) -> List[Dict]:
+    feed = feedparser.parse(content)
+    articles = []
+    for entry in feed.entries[:limit]: # Limit to top N most recent per feed
+        # Published date parsing can be tricky; feedparser usually gives 'published_parsed' (struct_time)
+        # We let the ingestion service handle normalization of the 'published' string or fallback.
+        articles.append({
+            "title": entry.title,
+            "url": entry.link,
+            "source": feed.feed.title if 'title' in feed.feed else "RSS Feed",
+            "content": entry.summary if 'summary' in entry else entry.description if 'description' in entry else "",
+            "published_at": entry.published if 'published' in entry else None
+        })
+    return articles
+
+PARSERS = {
+    "arxiv": parse_arxiv_feed,
+    "rss": parse_rss_feed,
+}
+
+# --- Executor ---
+
+_executor: Optional[Executor] = None
+
+def get_parse_executor() -> Optional[Executor]:
+    """
+    Returns the shared parsing executor, creating it on first use.
+    FEED_PARSE_EXECUTOR: "process" (default), "thread", or "inline" (parse on the event loop).
+    """
+    global _executor
+    mode = settings.FEED_PARSE_EXECUTOR.lower()
+    if mode == "inline":
+        return None
+    if _executor is None:
+        workers = settings.FEED_PARSE_WORKERS
+        if mode == "thread":
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed-parse")
+        else:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"Feed parsing executor started ({mode}, {workers} workers)")
+    return _executor
+
+def shutdown_parse_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+async def parse_feed(kind: str, content: bytes, *args) -> List[Dict]:
+    """Parses feed bytes off the event loop and returns the normalized entries."""
+    parser = PARSERS[kind]
+    executor = get_parse_executor()
+    if executor is None:
+        return parser(content, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, parser, content, *args)
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+_CLOSED = object()
+
+class StageQueue:
+    """
+    Bounded queue between two pipeline stages. A full queue blocks the
+    producer (back-pressure); the time producers spend blocked and the depth
+    seen on every put/get show which side of the queue is the bottleneck.
+    """
+
+    def __init__(self, name: str, maxsize: int = 0):
+        self.name = name
+        self.maxsize = maxsize
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.closed = False
+        self.items = 0
+        self.max_depth = 0
+        self.depth_total = 0
+        self.samples = 0
+        self.blocked_seconds = 0.0
+
+    def _sample(self):
+        depth = self.queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_total += depth
+        self.samples += 1
+
+    async def put(self, item: Any):
+        if self.queue.full():
+            started = time.perf_counter()
+            await self.queue.put(item)
+            self.blocked_seconds += time.perf_counter() - started
+        else:
+            self.queue.put_nowait(item)
+        if item is not _CLOSED:
+            self.items += 1
+            self._sample()
+
+    async def close(self):
+        """Tells the consumer no more items will come."""
+        await self.put(_CLOSED)
+
+    async def get(self) -> Optional[Any]:
+        """Next item, or None once the queue is closed and drained."""
+        if self.closed:
+            return None
+        item = await self.queue.get()
+        self._sample()
+        if item is _CLOSED:
+            self.closed = True
+            return None
+        return item
+
+    async def get_batch(self, max_items: int) -> List[Any]:
+        """Waits for one item, then takes up to `max_items` that are already waiting; [] once closed."""
+        first = await self.get()
+        if first is None:
+            return []
+        batch = [first]
+        while len(batch) < max_items and not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is _CLOSED:
+                self.closed = True
+                break
+            batch.append(item)
+        self._sample()
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    def stats(self) -> dict:
+        return {
+            "maxsize": self.maxsize,
+            "items": self.items,
+            "max_depth": self.max_depth,
+            "avg_depth": round(self.depth_total / self.samples, 1) if self.samples else 0,
+            "producer_blocked_s": round(self.blocked_seconds, 3),
+        }
+
+class StageMeter:
+    """Items a stage handled and the window it was active in (first item to finish)."""
+
+    def __init__(self, name: str, origin: float):
+        self.name = name
+        self.origin = origin
+        self.items = 0
+        self.first_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def count(self, n: int = 1):
+        if self.first_at is None:
+            self.first_at = time.perf_counter()
+        self.items += n
+
+    def finish(self):
+        self.finished_at = time.perf_counter()
+
+    def active_seconds(self) -> float:
+        if self.first_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.first_at
+
+    def stats(self) -> dict:
+        active = self.active_seconds()
+        return {
+            "items": self.items,
+            "active_s": round(active, 3),
+            "finished_at_s": round(self.finished_at - self.origin, 3) if self.finished_at else None,
+            "items_per_s": round(self.items / active, 1) if active else None,
+        }
+
+class Pipeline:
+    """The queues and meters of one streaming ingestion run."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.started = time.perf_counter()
+        self.queues: Dict[str, StageQueue] = {}
+        self.meters: Dict[str, StageMeter] = {}
+
+    def queue(self, name: str, maxsize: Optional[int] = None) -> StageQueue:
+        self.queues[name] = StageQueue(name, self.queue_size if maxsize is None else maxsize)
+        return self.queues[name]
+
+    def meter(self, name: str) -> StageMeter:
+        self.meters[name] = StageMeter(name, self.started)
+        return self.meters[name]
+
+    async def run(self, *stages: Awaitable):
+        """Runs the stage coroutines together; if one fails the others are cancelled and the error re-raised."""
+        tasks = [asyncio.ensure_future(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def seconds(self) -> Dict[str, float]:
+        """Active seconds per stage (stages overlap, so these do not add up to the run time)."""
+        return {name: round(meter.active_seconds(), 3) for name, meter in self.meters.items()}
+
+    def stats(self) -> dict:
+        return {
+            "queue_size": self.queue_size,
+            "elapsed_s": round(time.perf_counter() - self.started, 3),
+            "stages": {name: meter.stats() for name, meter in self.meters.items()},
+            "queues": {name: queue.stats() for name, queue in self.queues.items()},
+        }
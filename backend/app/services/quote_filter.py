@@ -0,0 +1,79 @@
+import re
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.services.text_prep import clean_text
+
+SPEAKER_VERBS = [
+    "said", "says", "told", "tells", "added", "adds", "explained", "explains", "warned", "warns",
+    "predicted", "predicts", "argued", "argues", "noted", "notes", "wrote", "writes", "stated", "states",
+    "recalled", "insisted", "admitted", "claimed", "claims", "according to",
+]
+EVENT_TERMS = ["interview", "speech", "keynote", "podcast", "fireside chat", "testimony", "remarks", "statement", "talk"]
+ROLE_TERMS = [
+    "ceo", "cto", "cfo", "coo", "founder", "co-founder", "cofounder", "president", "chairman", "chairwoman",
+    "chief", "professor", "researcher", "scientist", "director", "vice president", "head of", "spokesperson",
+    "analyst", "minister", "senator", "engineer",
+]
+
+def _terms(terms: List[str]) -> str:
+    return "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+
+# Every signal in one compiled alternation, so an article is scanned in a single pass.
+# Text inside a quoted span is consumed with it: a verb there is not an attribution.
+# Quoted text must start and end next to its marks, so the gap between two
+# straight-quoted terms ('the "AI bubble" and "AI winter"') is not taken for a quote.
+SIGNAL_PATTERN = re.compile(
+    r'(?P<quoted>["“](?=\S)[^"“”]{20,500}(?<=\S)["”])'
+    rf"|(?P<verb>\b(?i:{_terms(SPEAKER_VERBS)})\b)"
+    rf"|(?P<event>\b(?i:{_terms(EVENT_TERMS)})\b)"
+    rf"|(?P<role>\b(?i:{_terms(ROLE_TERMS)})\b)"
+    r"|(?P<name>\b[A-Z][a-z]+(?:[ -][A-Z][a-z]+)+\b)" # Two or more capitalized words: a likely person
+)
+ATTRIBUTION_WINDOW = 60 # Characters between a speaker verb and the quote or name it attributes
+QUOTE_DENSITY_SATURATION = 1.0 # Quoted spans per 100 words at which density counts in full
+MAX_SCAN_CHARS = 10000
+
+def quote_signals(title: str, content: str) -> Dict[str, float]:
+    """Counts of quoted spans, attributed speaker verbs, names, roles and event terms in title + content."""
+    text = f"{clean_text(title)}. {clean_text(content)}"[:MAX_SCAN_CHARS]
+    spans = {"quoted": [], "verb": [], "event": [], "role": [], "name": []}
+    for match in SIGNAL_PATTERN.finditer(text):
+        spans[match.lastgroup].append(match.span())
+
+    # A verb is attributed when a quote or a name sits right before or after it ('"...," said Jane Doe')
+    anchors = spans["quoted"] + spans["name"]
+    attributed = sum(
+        1 for start, end in spans["verb"]
+        if any(a_start - ATTRIBUTION_WINDOW <= end and start <= a_end + ATTRIBUTION_WINDOW for a_start, a_end in anchors)
+    )
+    words = max(1, len(text.split()))
+    return {
+        "quoted": len(spans["quoted"]),
+        "density": len(spans["quoted"]) * 100 / words,
+        "attributed": attributed,
+        "names": len(spans["name"]),
+        "roles": len(spans["role"]),
+        "events": len(spans["event"]),
+    }
+
+def quote_score(title: str, content: str) -> float:
+    """
+    0-100 likelihood that an article carries a direct quote from a named
+    person: quoted spans and their density, speaker verbs attributing them,
+    and a role or event (interview, keynote) around the speaker. Without any
+    quoted span the speaker signals count half: that is reported speech.
+    """
+    s = quote_signals(title, content)
+    quoted = 35 * min(1.0, s["quoted"] / 2) + 15 * min(1.0, s["density"] / QUOTE_DENSITY_SATURATION)
+    speaker = 30 * min(1.0, s["attributed"] / 2) + 10 * min(1.0, s["roles"]) + 10 * min(1.0, s["events"])
+    return round(quoted + (speaker if s["quoted"] else speaker / 2), 1)
+
+def wants_quote(title: str, content: str, min_score: Optional[float] = None) -> bool:
+    """
+    Whether the enrichment prompt should ask for the article's quote: it
+    scores at least `min_score` (QUOTE_MIN_SCORE). Below that the model would
+    only find a paraphrase or make one up, so the prompt is spared the quote task.
+    """
+    min_score = settings.QUOTE_MIN_SCORE if min_score is None else min_score
+    return min_score <= 0 or quote_score(title, content) >= min_score
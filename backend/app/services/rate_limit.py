@@ -0,0 +1,118 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, List
+
+class TokenBucket:
+    """
+    Token bucket shared by all AI calls. `rate` tokens per minute, up to `burst` saved up.
+    acquire() suspends the calling coroutine, never the event loop.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.waited = 0.0
+        self.acquired = 0 # Provider requests made through this bucket
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        self.acquired += 1
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.waited += wait
+            await asyncio.sleep(wait)
+
+class ModelCooldowns:
+    """
+    Per-model 429 back-off. A rate-limited model is skipped (callers move on to
+    a fallback model) until its cooldown expires.
+    """
+
+    def __init__(self):
+        self.until: Dict[str, float] = {}
+        self.hits: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def penalize(self, model: str, seconds: float):
+        with self.lock:
+            self.until[model] = max(self.until.get(model, 0.0), time.monotonic() + seconds)
+            self.hits[model] = self.hits.get(model, 0) + 1
+
+    def remaining(self, model: str) -> float:
+        with self.lock:
+            return max(0.0, self.until.get(model, 0.0) - time.monotonic())
+
+    def available(self, models: List[str]) -> List[str]:
+        return [m for m in models if self.remaining(m) == 0.0]
+
+    def soonest(self, models: List[str]) -> float:
+        """Seconds until the first of `models` is usable again."""
+        return min((self.remaining(m) for m in models), default=0.0)
+
+class TokenBudget:
+    """
+    Per-run and per-day LLM token allowance (input + output). A limit of 0 means
+    unlimited. `spent_today` is what earlier runs used since midnight UTC.
+    """
+
+    def __init__(self, run_limit: int = 0, daily_limit: int = 0, spent_today: int = 0):
+        self.run_limit = run_limit
+        self.daily_limit = daily_limit
+        self.spent_today = spent_today
+
+    def exhausted(self, spent_this_run: int) -> bool:
+        if self.run_limit and spent_this_run >= self.run_limit:
+            return True
+        return bool(self.daily_limit) and self.spent_today + spent_this_run >= self.daily_limit
+
+    def split(self, parts: int) -> "TokenBudget":
+        """
+        One share of this budget for `parts` workers spending it concurrently:
+        the run limit and what is left of the daily limit are divided evenly.
+        """
+        if parts <= 1:
+            return self
+        # A set limit never rounds down to 0, which would mean unlimited
+        run_limit = max(1, self.run_limit // parts) if self.run_limit else 0
+        daily_limit = 0
+        if self.daily_limit:
+            left = max(0, self.daily_limit - self.spent_today)
+            daily_limit = max(1, self.spent_today + left // parts)
+        return TokenBudget(run_limit, daily_limit, self.spent_today)
+
+    def stats(self, spent_this_run: int) -> dict:
+        return {
+            "run_limit": self.run_limit,
+            "daily_limit": self.daily_limit,
+            "spent_today_before_run": self.spent_today,
+            "spent_this_run": spent_this_run,
+            "exhausted": self.exhausted(spent_this_run),
+        }
+
+RETRY_DELAY_PATTERN = re.compile(r"retry[_ -]?(?:delay|after)\D{0,20}?(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return "429" in str(error) or "rate limit" in str(error).lower() or "resource exhausted" in str(error).lower()
+
+def retry_after_seconds(error: Exception, default: float) -> float:
+    """Retry delay suggested by the provider's error message, if it gives one."""
+    match = RETRY_DELAY_PATTERN.search(str(error))
+    if match:
+        return float(match.group(1))
+    return default
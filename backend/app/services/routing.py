@@ -0,0 +1,41 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.classifier import keyword_classifier
+
+# Prior relevance (0-100) by the `source` field the fetchers set; RSS feeds use their feed title
+SOURCE_PRIORS = {
+    "Arxiv": 80,
+    "Hacker News": 40,
+}
+DEFAULT_SOURCE_PRIOR = 60
+SOURCE_WEIGHT = 0.4 # Share of the score that comes from the source; the rest is topical
+TOPICAL_SATURATION = 0.5 # Keyword score at which an article counts as fully on-topic
+
+def relevance_scores(raw_articles: Sequence[Dict]) -> np.ndarray:
+    """
+    Cheap 0-100 pre-score from source and keywords, for the whole batch at once.
+    Uses the simple provider's keyword classifier, so it costs microseconds per article.
+    """
+    if not raw_articles:
+        return np.zeros(0)
+    keyword_scores = keyword_classifier.scores([(raw.get('title') or "", raw.get('content') or "") for raw in raw_articles])
+    topical = np.minimum(1.0, keyword_scores.max(axis=1) / TOPICAL_SATURATION)
+    priors = np.array([SOURCE_PRIORS.get(raw.get('source'), DEFAULT_SOURCE_PRIOR) for raw in raw_articles], dtype=float)
+    return np.round(SOURCE_WEIGHT * priors + (100 - SOURCE_WEIGHT * 100) * topical, 1)
+
+def route(raw_articles: Sequence[Dict], threshold: float) -> Tuple[List[Dict], List[Tuple[Dict, float]]]:
+    """
+    Splits articles into (llm, local). Articles scoring below `threshold` go to
+    the local tier, paired with their score; threshold 0 sends everything to the LLM.
+    """
+    if threshold <= 0:
+        return list(raw_articles), []
+    llm, local = [], []
+    for raw, score in zip(raw_articles, relevance_scores(raw_articles)):
+        if score >= threshold:
+            llm.append(raw)
+        else:
+            local.append((raw, float(score)))
+    return llm, local
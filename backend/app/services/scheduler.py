@@ -0,0 +1,27 @@
+import logging
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from app.core.config import settings
+from app.services.ingestion import run_ingestion_job
+
+logger = logging.getLogger(__name__)
+
+def create_scheduler() -> AsyncIOScheduler:
+    """
+    The background jobs, for the API process (SCHEDULER_IN_API) or the
+    dedicated run_scheduler.py worker. Every instance may tick; the job's
+    lease lets only one of them run each tick.
+    """
+    scheduler = AsyncIOScheduler()
+    # Check the source registry every few minutes; each source is polled on its own interval
+    scheduler.add_job(
+        run_ingestion_job,
+        trigger=IntervalTrigger(minutes=settings.INGESTION_TICK_MINUTES),
+        kwargs={"due_only": True, "auto_resume": True},
+        id="ingestion_job",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    return scheduler
@@ -0,0 +1,79 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.db.models import IngestionSource
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the rolling latency average
+LATENCY_EWMA_ALPHA = 0.3
+
+def circuit_state(source: IngestionSource, now: Optional[datetime] = None) -> str:
+    """
+    "closed": polled normally. "open": failing, skipped until circuit_open_until.
+    "half_open": back-off elapsed, the next poll is a probe.
+    """
+    now = now or datetime.now(timezone.utc)
+    if not source.circuit_open_until:
+        return "closed"
+    return "open" if source.circuit_open_until > now else "half_open"
+
+def is_available(source: IngestionSource, now: Optional[datetime] = None) -> bool:
+    return circuit_state(source, now) != "open"
+
+def backoff_for(failures: int) -> timedelta:
+    """Exponential back-off once the failure threshold is reached, capped at SOURCE_BACKOFF_MAX_MINUTES."""
+    doublings = max(0, failures - settings.SOURCE_FAILURE_THRESHOLD)
+    minutes = settings.SOURCE_BACKOFF_MINUTES * (2 ** min(doublings, 10))
+    return timedelta(minutes=min(minutes, settings.SOURCE_BACKOFF_MAX_MINUTES))
+
+def record_result(source: IngestionSource, result: Dict, now: Optional[datetime] = None):
+    """
+    Updates a source's health from one fetch result ({"latency": s, "error": str | None}).
+    Opens the circuit after SOURCE_FAILURE_THRESHOLD consecutive failures; a failed
+    probe re-opens it with a longer back-off, a successful one closes it.
+    """
+    now = now or datetime.now(timezone.utc)
+    latency_ms = result["latency"] * 1000
+    if source.avg_latency_ms is None:
+        source.avg_latency_ms = round(latency_ms)
+    else:
+        source.avg_latency_ms = round(LATENCY_EWMA_ALPHA * latency_ms + (1 - LATENCY_EWMA_ALPHA) * source.avg_latency_ms)
+
+    if result["error"] is None:
+        if source.circuit_open_until:
+            logger.info(f"Source {source.id} recovered, closing circuit")
+        source.consecutive_failures = 0
+        source.last_success_at = now
+        source.circuit_open_until = None
+        return
+
+    source.consecutive_failures = (source.consecutive_failures or 0) + 1
+    source.last_failure_at = now
+    source.last_error = result["error"][:1000]
+    if source.consecutive_failures >= settings.SOURCE_FAILURE_THRESHOLD:
+        backoff = backoff_for(source.consecutive_failures)
+        source.circuit_open_until = now + backoff
+        logger.warning(
+            f"Source {source.id} failed {source.consecutive_failures} times in a row, "
+            f"skipping it for {backoff} (last error: {source.last_error})"
+        )
+
+def health_summary(source: IngestionSource, now: Optional[datetime] = None) -> dict:
+    return {
+        "id": source.id,
+        "type": source.type,
+        "url": source.url,
+        "enabled": source.enabled,
+        "circuit": circuit_state(source, now),
+        "circuit_open_until": source.circuit_open_until,
+        "consecutive_failures": source.consecutive_failures or 0,
+        "last_success_at": source.last_success_at,
+        "last_failure_at": source.last_failure_at,
+        "last_error": source.last_error,
+        "avg_latency_ms": source.avg_latency_ms,
+        "last_polled_at": source.last_polled_at,
+        "poll_interval_minutes": source.poll_interval_minutes,
+    }
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from app.db.models import IngestionSource
+from app.services.sources import ContentFetcher
+from app.services.source_health import is_available, record_result
+
+logger = logging.getLogger(__name__)
+
+# Used when the ingestion_sources table has not been created yet
+# (database/09_ingestion_sources_schema.sql seeds the same rows).
+DEFAULT_SOURCES = [
+    IngestionSource(id="arxiv", type="arxiv", url="https://export.arxiv.org/api/query", item_limit=10,
+                    poll_interval_minutes=240, enabled=True, options={"search_query": "cat:cs.AI OR cat:cs.SE"}),
+    IngestionSource(id="hacker-news", type="hacker_news", url="https://hacker-news.firebaseio.com/v0", item_limit=10,
+                    poll_interval_minutes=30, concurrency=8, enabled=True),
+    IngestionSource(id="techcrunch-ai", type="rss", url="https://techcrunch.com/category/artificial-intelligence/feed/",
+                    item_limit=10, poll_interval_minutes=60, enabled=True),
+    IngestionSource(id="the-verge", type="rss", url="https://www.theverge.com/rss/index.xml",
+                    item_limit=10, poll_interval_minutes=60, enabled=True),
+    IngestionSource(id="openai-blog", type="rss", url="https://openai.com/blog/rss.xml",
+                    item_limit=10, poll_interval_minutes=240, enabled=True),
+]
+
+# --- Source types ---
+# A source type fetches every due source of that type in one call, so types
+# like RSS can share a concurrent fetch. It yields (source, articles) for each
+# source as soon as that source is done. Register new types with @source_type.
+
+FetchFn = Callable[[ContentFetcher, List[IngestionSource]], AsyncIterator[Tuple[IngestionSource, List[Dict]]]]
+SOURCE_TYPES: Dict[str, FetchFn] = {}
+
+def source_type(name: str):
+    def register(fn: FetchFn) -> FetchFn:
+        SOURCE_TYPES[name] = fn
+        return fn
+    return register
+
+@source_type("arxiv")
+async def fetch_arxiv(fetcher: ContentFetcher, sources: List[IngestionSource]) -> AsyncIterator[Tuple[IngestionSource, List[Dict]]]:
+    for source in sources:
+        options = source.options or {}
+        kwargs = {"search_query": options["search_query"]} if options.get("search_query") else {}
+        yield source, await fetcher.fetch_arxiv_papers(max_results=source.item_limit, base_url=source.url, **kwargs)
+
+@source_type("hacker_news")
+async def fetch_hacker_news(fetcher: ContentFetcher, sources: List[IngestionSource]) -> AsyncIterator[Tuple[IngestionSource, List[Dict]]]:
+    for source in sources:
+        yield source, await fetcher.fetch_hacker_news(limit=source.item_limit, concurrency=source.concurrency, base_url=source.url)
+
+@source_type("rss")
+async def fetch_rss(fetcher: ContentFetcher, sources: List[IngestionSource]) -> AsyncIterator[Tuple[IngestionSource, List[Dict]]]:
+    by_url = {source.url: source for source in sources}
+    limits = {source.url: source.item_limit for source in sources}
+    async for url, articles in fetcher.stream_rss_feeds(list(by_url), item_limits=limits):
+        yield by_url[url], articles
+
+# --- Registry ---
+
+class SourceRegistry:
+    def __init__(self, db: Session):
+        self.db = db
+        self.persistent = True
+        try:
+            self.sources = db.query(IngestionSource).order_by(IngestionSource.id).all()
+        except Exception as e:
+            logger.warning(f"Source registry table unavailable, using built-in defaults: {e}")
+            db.rollback()
+            self.persistent = False
+            self.sources = list(DEFAULT_SOURCES)
+
+    def select(self, due_only: bool = False, source_ids: Optional[List[str]] = None) -> List[IngestionSource]:
+        """
+        Enabled sources to poll now. `source_ids` picks sources explicitly;
+        `due_only` keeps only those whose poll interval has elapsed.
+        Sources with an open circuit are skipped unless named in `source_ids`.
+        """
+        now = datetime.now(timezone.utc)
+        selected = []
+        for source in self.sources:
+            if source_ids is not None:
+                if source.id in source_ids:
+                    selected.append(source)
+                continue
+            if not source.enabled:
+                continue
+            if not is_available(source, now):
+                logger.info(f"Skipping source {source.id}: circuit open until {source.circuit_open_until}")
+                continue
+            if due_only and source.last_polled_at:
+                next_poll = source.last_polled_at + timedelta(minutes=source.poll_interval_minutes or 120)
+                if next_poll > now:
+                    continue
+            selected.append(source)
+        return selected
+
+    def mark_polled(self, sources: List[IngestionSource]):
+        """Stamps last_polled_at."""
+        now = datetime.now(timezone.utc)
+        for source in sources:
+            source.last_polled_at = now
+        self._save()
+
+    def _save(self):
+        if self.persistent:
+            self.db.commit()
+
+    async def fetch(self, fetcher: ContentFetcher, sources: List[IngestionSource]) -> List[Dict]:
+        """Fetches all given sources, one concurrent task per source type."""
+        articles = []
+        async for chunk in self.fetch_stream(fetcher, sources):
+            articles += chunk
+        return articles
+
+    async def fetch_stream(self, fetcher: ContentFetcher, sources: List[IngestionSource]) -> AsyncIterator[List[Dict]]:
+        """
+        Like fetch(), but yields each source's articles as soon as that source
+        is done (each RSS feed on its own, while slower feeds are still
+        downloading). Each source's health is recorded and committed as it
+        finishes, so it does not depend on the rest of the run.
+        """
+        by_type: Dict[str, List[IngestionSource]] = {}
+        for source in sources:
+            if source.type not in SOURCE_TYPES:
+                logger.error(f"Unknown source type '{source.type}' for source {source.id}, skipping")
+                continue
+            by_type.setdefault(source.type, []).append(source)
+
+        # (source, articles, fetch outcome) as sources finish; None when a type is done
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def fetch_type(kind: str, group: List[IngestionSource]):
+            reported = set()
+            try:
+                async for source, articles in SOURCE_TYPES[kind](fetcher, group):
+                    reported.add(source.id)
+                    finished.put_nowait((source, articles, fetcher.source_results.get(source.url.rstrip("/"))))
+                # Cut off by the RSS deadline: a timeout outcome. Never got to run: no outcome, state kept
+                for source in group:
+                    if source.id not in reported:
+                        finished.put_nowait((source, [], fetcher.source_results.get(source.url.rstrip("/"))))
+            except Exception as e:
+                logger.error(f"Fetching {kind} sources failed: {e}")
+                for source in group:
+                    if source.id not in reported:
+                        finished.put_nowait((source, [], {"latency": 0.0, "error": str(e) or repr(e)}))
+            finally:
+                finished.put_nowait(None)
+
+        tasks = [asyncio.create_task(fetch_type(kind, group)) for kind, group in by_type.items()]
+        try:
+            running = len(tasks)
+            while running:
+                item = await finished.get()
+                if item is None:
+                    running -= 1
+                    continue
+                source, articles, outcome = item
+                if outcome:
+                    record_result(source, outcome)
+                    self._save()
+                if articles:
+                    yield articles
+        finally:
+            for task in tasks:
+                task.cancel()
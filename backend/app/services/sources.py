@@ -1,64 +1,156 @@
-import feedparser
-import httpx
+import asyncio
 import logging
-from typing import List, Dict
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+from app.core.config import settings
+from app.services.http_client import PooledHTTPClient
+from app.services.feed_cache import FeedCache
+from app.services.parsing import parse_feed
+from app.services.metrics import percentile
 
 logger = logging.getLogger(__name__)
 
 class ContentFetcher:
-    async def fetch_arxiv_papers(self, max_results: int = 10) -> List[Dict]:
+    def __init__(self, hn_base_url: Optional[str] = None):
+        self.hn_base_url = (hn_base_url or settings.HN_API_URL).rstrip("/")
+        self.http: Optional[PooledHTTPClient] = None
+        self.feed_cache: Optional[FeedCache] = None
+        self.last_rss_stats: Dict = {}
+        # url -> {"latency": seconds, "error": str | None} for every source fetched this session
+        self.source_results: Dict[str, Dict] = {}
+
+    @asynccontextmanager
+    async def session(self, feed_cache: Optional[FeedCache] = None, **pool_options):
+        """
+        Opens the shared HTTP pool for the duration of an ingestion run.
+        Nested calls reuse the pool that is already open; fetch methods called
+        outside a session get a short-lived one of their own.
+        With a feed_cache, feed requests are conditional GETs for the session.
+        """
+        if self.http is not None:
+            yield self.http
+            return
+
+        self.http = PooledHTTPClient(**pool_options)
+        self.feed_cache = feed_cache
+        self.last_rss_stats = {}
+        self.source_results = {}
+        try:
+            yield self.http
+        finally:
+            http, self.http, self.feed_cache = self.http, None, None
+            await http.aclose()
+
+    def _record(self, url: str, started: float, error: Optional[Exception] = None):
+        """Remembers how a source fetch went, for the registry's health tracking."""
+        self.source_results[url.rstrip("/")] = {
+            "latency": time.perf_counter() - started,
+            "error": (str(error) or repr(error)) if error is not None else None,
+        }
+
+    def _track_feed(self, url: str, articles: List[Dict], params: Optional[dict] = None) -> List[Dict]:
+        """Tells the feed cache which feed `articles` came from; returns them."""
+        if self.feed_cache is None:
+            return articles
+        return self.feed_cache.track(FeedCache.key(url, params), articles)
+
+    async def _get_feed(self, url: str, params: Optional[dict] = None) -> Optional[bytes]:
         """
-        Fetches recent papers from Arxiv for CS.AI and CS.SE.
+        GETs a feed body, sending cached validators when a feed cache is active.
+        Returns None when the feed is unchanged, so the caller can skip parsing.
+        """
+        async with self.session() as http:
+            cache = self.feed_cache
+            if cache is None:
+                response = await http.get(url, params=params, timeout=10.0)
+                response.raise_for_status()
+                return response.content
+
+            key = FeedCache.key(url, params)
+            response = await http.get(url, params=params, headers=cache.conditional_headers(key), timeout=10.0)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return cache.changed_content(key, response)
+
+    async def fetch_arxiv_papers(
+        self,
+        max_results: int = 10,
+        base_url: str = "https://export.arxiv.org/api/query",
+        search_query: str = "cat:cs.AI OR cat:cs.SE",
+    ) -> List[Dict]:
+        """
+        Fetches recent papers from Arxiv (CS.AI and CS.SE by default).
         """
         # http://export.arxiv.org/api/query?search_query=cat:cs.AI+OR+cat:cs.SE&start=0&max_results=10&sortBy=submittedDate&sortOrder=desc
-        base_url = "https://export.arxiv.org/api/query"
         params = {
-            "search_query": "cat:cs.AI OR cat:cs.SE",
+            "search_query": search_query,
             "start": 0,
             "max_results": max_results,
             "sortBy": "submittedDate",
             "sortOrder": "desc"
         }
         
+        started = time.perf_counter()
         try:
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(base_url, params=params, timeout=10.0)
-                feed = feedparser.parse(response.content)
-                
-                papers = []
-                for entry in feed.entries:
-                    papers.append({
-                        "title": entry.title,
-                        "url": entry.id,
-                        "source": "Arxiv",
-                        "content": entry.summary, # Abstract
-                        "published_at": entry.published
-                    })
-                return papers
+            content = await self._get_feed(base_url, params=params)
+            self._record(base_url, started)
+            if content is None:
+                logger.info("Arxiv feed unchanged since last run, skipping parse")
+                return []
+
+            return self._track_feed(base_url, await parse_feed("arxiv", content), params)
         except Exception as e:
             logger.error(f"Error fetching Arxiv: {e}")
+            self._record(base_url, started, e)
             return []
 
-    async def fetch_hacker_news(self, limit: int = 10) -> List[Dict]:
+    async def fetch_hacker_news(
+        self,
+        limit: int = 10,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        base_url: Optional[str] = None,
+    ) -> List[Dict]:
         """
         Fetches top stories from Hacker News.
+
+        Item lookups fan out with at most `concurrency` requests in flight
+        (1 = sequential). An item that times out or errors is skipped so the
+        rest of the batch still comes back, in topstories rank order.
         """
         # HN API is firebase. items are IDs.
         # 1. Get topstories
         # 2. Get details for top N
-        base_url = "https://hacker-news.firebaseio.com/v0"
+        base_url = (base_url or self.hn_base_url).rstrip("/")
+        concurrency = max(1, concurrency or settings.HN_FETCH_CONCURRENCY)
+        item_timeout = item_timeout or settings.HN_ITEM_TIMEOUT
+        started = time.perf_counter()
         
         try:
-            async with httpx.AsyncClient() as client:
+            async with self.session() as http:
                 # Get Top IDs
-                resp = await client.get(f"{base_url}/topstories.json", timeout=10.0)
+                resp = await http.get(f"{base_url}/topstories.json", timeout=10.0)
+                resp.raise_for_status()
                 ids = resp.json()[:limit]
+                self._record(base_url, started)
+
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def fetch_item(item_id):
+                    async with semaphore:
+                        try:
+                            item_resp = await http.get(f"{base_url}/item/{item_id}.json", timeout=item_timeout)
+                            item_resp.raise_for_status()
+                            return item_resp.json()
+                        except Exception as e:
+                            logger.warning(f"Skipping Hacker News item {item_id}: {e!r}")
+                            return None
+
+                items = await asyncio.gather(*(fetch_item(item_id) for item_id in ids))
                 
                 stories = []
-                for id in ids:
-                    item_resp = await client.get(f"{base_url}/item/{id}.json", timeout=5.0)
-                    item = item_resp.json()
-                    
+                for item in items:
                     if item and "url" in item:
                         stories.append({
                             "title": item.get("title"),
@@ -70,40 +162,109 @@ class ContentFetcher:
                             # Let's assume title is what we have for now.
                             "published_at": item.get("time") # This is unix timestamp, needs conversion later
                         })
-                return stories
+                if len(stories) < len(ids):
+                    logger.info(f"Hacker News: {len(stories)}/{len(ids)} items usable")
                 return stories
         except Exception as e:
             logger.error(f"Error fetching Hacker News: {e}")
+            self._record(base_url, started, e)
             return []
 
-    async def fetch_rss_feeds(self, feed_urls: List[str]) -> List[Dict]:
+    async def fetch_rss_feeds(
+        self,
+        feed_urls: List[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        item_limits: Optional[Dict[str, int]] = None,
+    ) -> List[Dict]:
         """
-        Fetches and parses multiple RSS feeds.
+        Fetches and parses multiple RSS feeds concurrently.
+        Each feed contributes at most 10 entries unless `item_limits` says otherwise.
+
+        At most `concurrency` feeds are in flight (the shared pool also caps
+        requests per host). Feeds still running after `deadline` seconds are
+        cancelled and the run continues with whatever arrived in time.
+        Per-feed latency for the call is kept in `self.last_rss_stats`.
         """
         all_articles = []
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            for url in feed_urls:
+        async for _, articles in self.stream_rss_feeds(feed_urls, concurrency, deadline, item_limits):
+            all_articles.extend(articles)
+        return all_articles
+
+    async def stream_rss_feeds(
+        self,
+        feed_urls: List[str],
+        concurrency: Optional[int] = None,
+        deadline: Optional[float] = None,
+        item_limits: Optional[Dict[str, int]] = None,
+    ) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """Like fetch_rss_feeds(), but yields (url, articles) for each feed as soon as it is parsed."""
+        concurrency = max(1, concurrency or settings.RSS_FETCH_CONCURRENCY)
+        deadline = deadline or settings.RSS_FETCH_DEADLINE
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: Dict[str, float] = {}
+
+        async def fetch_feed(url: str) -> List[Dict]:
+            async with semaphore:
+                started = time.perf_counter()
                 try:
-                    # Some RSS feeds block simple requests, might need User-Agent
-                    response = await client.get(url, timeout=10.0, headers={"User-Agent": "SynapseDigest/1.0"})
-                    feed = feedparser.parse(response.content)
-                    
-                    for entry in feed.entries[:10]: # Limit to top 10 most recent per feed
-                        # Normalize fields
-                        # Published date parsing can be tricky; feedparser usually gives 'published_parsed' (struct_time)
-                        # We will let the ingestion service handle normalization of 'published' string or fallback.
-                        
-                        all_articles.append({
-                            "title": entry.title,
-                            "url": entry.link,
-                            "source": feed.feed.title if 'title' in feed.feed else "RSS Feed",
-                            "content": entry.summary if 'summary' in entry else entry.description if 'description' in entry else "", 
-                            "published_at": entry.published if 'published' in entry else None
-                        })
+                    # Some RSS feeds block simple requests; the pool sends a User-Agent
+                    content = await self._get_feed(url)
+                    self._record(url, started)
+                except asyncio.CancelledError:
+                    self._record(url, started, TimeoutError(f"RSS deadline of {deadline}s exceeded"))
+                    raise
                 except Exception as e:
                     logger.error(f"Error fetching RSS {url}: {e}")
-                    continue
-        
-        return all_articles
+                    self._record(url, started, e)
+                    return []
+                finally:
+                    latencies[url] = time.perf_counter() - started
+
+            if content is None:
+                logger.info(f"RSS {url} unchanged since last run, skipping parse")
+                return []
+
+            try:
+                return self._track_feed(url, await parse_feed("rss", content, (item_limits or {}).get(url, 10)))
+            except Exception as e:
+                logger.error(f"Error parsing RSS {url}: {e}")
+                return []
+
+        async with self.session():
+            tasks = {asyncio.create_task(fetch_feed(url)): url for url in feed_urls}
+            try:
+                loop = asyncio.get_running_loop()
+                ends_at = loop.time() + deadline
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, timeout=max(0.0, ends_at - loop.time()),
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for task in done:
+                        yield tasks[task], task.result()
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+            finally:
+                # Also reached when the caller stops early
+                for task in tasks:
+                    task.cancel()
+
+        timed_out = [url for task, url in tasks.items() if task.cancelled()]
+        if timed_out:
+            logger.warning(f"RSS deadline of {deadline}s hit, skipped {len(timed_out)} feed(s): {timed_out}")
+
+        samples = sorted(latencies.values())
+        self.last_rss_stats = {
+            "feeds": len(feed_urls),
+            "completed": len(feed_urls) - len(timed_out),
+            "timed_out": timed_out,
+            "p50_ms": round(percentile(samples, 50) * 1000, 1),
+            "p95_ms": round(percentile(samples, 95) * 1000, 1),
+            "latency_ms": {url: round(seconds * 1000, 1) for url, seconds in latencies.items()},
+        }
 
 fetcher = ContentFetcher()
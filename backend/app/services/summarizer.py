@@ -0,0 +1,89 @@
+import re
+from typing import List, Sequence
+
+import numpy as np
+
+from app.services.text_prep import clean_text
+
+# Sentence ends, except after common abbreviations ("Dr. Smith")
+SENTENCE_PATTERN = re.compile(r"(?<!\bMr\.)(?<!\bMs\.)(?<!\bDr\.)(?<!\bSt\.)(?<!\bvs\.)(?<=[.!?])[\"')\]]?\s+(?=[A-Z0-9\"'(\[])")
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9']+")
+
+STOPWORDS = set("""
+a about after all also an and any are as at be been but by can could did do does for from had has have he her
+his how i if in into is it its just more most new no not of on one or our out over said say says she so some
+such than that the their them then there these they this to up us was we were what when which who will with
+would you your
+""".split())
+
+MAX_CONTENT_CHARS = 8000
+MIN_SENTENCE_WORDS = 4
+LEAD_BONUS = 0.1 # News puts the point first; nudge the opening sentence
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in SENTENCE_PATTERN.split(text) if s.strip()]
+
+class CentroidSummarizer:
+    """
+    Extractive summaries without a model: sentences are TF-IDF vectors over the
+    article's own vocabulary, and the ones closest (cosine) to the article's
+    centroid vector are kept, in their original order.
+    """
+
+    def __init__(self, max_sentences: int = 2, max_chars: int = 400):
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+
+    def summarize_batch(self, texts: Sequence[str]) -> List[str]:
+        return [self.summarize(text) for text in texts]
+
+    def summarize(self, text: str) -> str:
+        sentences = split_sentences(clean_text(text)[:MAX_CONTENT_CHARS])
+        if len(sentences) <= self.max_sentences:
+            return self._fit(sentences)
+
+        vocabulary, rows, cols = {}, [], []
+        for i, sentence in enumerate(sentences):
+            for word in WORD_PATTERN.findall(sentence.lower()):
+                if word not in STOPWORDS:
+                    rows.append(i)
+                    cols.append(vocabulary.setdefault(word, len(vocabulary)))
+        if not vocabulary:
+            return self._fit(sentences[:self.max_sentences])
+
+        counts = np.zeros((len(sentences), len(vocabulary)))
+        np.add.at(counts, (np.asarray(rows), np.asarray(cols)), 1)
+
+        # Sentence-level IDF: words in every sentence carry no signal
+        df = (counts > 0).sum(axis=0)
+        tfidf = np.log1p(counts) * (np.log((1 + len(sentences)) / (1 + df)) + 1)
+        norms = np.linalg.norm(tfidf, axis=1)
+        centroid = tfidf.mean(axis=0)
+        scores = (tfidf @ centroid) / (np.where(norms == 0, 1, norms) * (np.linalg.norm(centroid) or 1))
+
+        words_per_sentence = np.bincount(np.asarray(rows), minlength=len(sentences))
+        scores[words_per_sentence < MIN_SENTENCE_WORDS] -= 1 # Fragments only if nothing else
+        scores[0] += LEAD_BONUS
+
+        best, seen = [], set()
+        for i in np.argsort(-scores, kind="stable"):
+            key = sentences[i].lower()
+            if key not in seen: # Syndicated copy often repeats a sentence verbatim
+                seen.add(key)
+                best.append(i)
+            if len(best) == self.max_sentences:
+                break
+        return self._fit([sentences[i] for i in sorted(best)])
+
+    def _fit(self, sentences: List[str]) -> str:
+        summary = ""
+        for sentence in sentences:
+            candidate = f"{summary} {sentence}".strip()
+            if summary and len(candidate) > self.max_chars:
+                break
+            summary = candidate
+        if len(summary) > self.max_chars:
+            summary = summary[:self.max_chars].rsplit(" ", 1)[0] + "..."
+        return summary
+
+summarizer = CentroidSummarizer()
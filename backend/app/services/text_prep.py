@@ -0,0 +1,48 @@
+import html
+import math
+import re
+
+TAG_PATTERN = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+# Trailers that feeds append to every item; they cost tokens and say nothing
+BOILERPLATE_PATTERNS = [
+    re.compile(r"The post .{1,200}? appeared first on .{1,100}?\.", re.IGNORECASE),
+    re.compile(r"\b(Continue reading|Read more|Read the full (story|article))\b.{0,100}$", re.IGNORECASE),
+    re.compile(r"\[(…|\.\.\.)\]"),
+    re.compile(r"\bArticle URL: \S+|\bComments URL: \S+|\bPoints: \d+|# Comments: \d+", re.IGNORECASE),
+]
+# Word pieces, single CJK characters (about one token each) and punctuation
+TOKEN_PIECE_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]|\w+|[^\w\s]")
+
+def clean_text(text: str) -> str:
+    """Drops HTML tags/entities (RSS summaries are often HTML) and collapses whitespace."""
+    text = html.unescape(TAG_PATTERN.sub(" ", text or ""))
+    return " ".join(text.split())
+
+def strip_boilerplate(text: str) -> str:
+    for pattern in BOILERPLATE_PATTERNS:
+        text = pattern.sub(" ", text)
+    return " ".join(text.split())
+
+def _piece_tokens(piece: str) -> int:
+    return max(1, math.ceil(len(piece) / 4)) if piece[0].isascii() else max(1, math.ceil(len(piece) / 2))
+
+def estimate_tokens(text: str) -> int:
+    """
+    Tokenizer-free token estimate: ~4 characters per token for ASCII words,
+    ~2 for other scripts' words, 1 per CJK character or punctuation mark.
+    Closer than len/4 for non-English text and markup-heavy input.
+    """
+    return sum(_piece_tokens(m.group()) for m in TOKEN_PIECE_PATTERN.finditer(text or ""))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` after roughly `max_tokens` tokens, at a piece boundary."""
+    used = 0
+    for m in TOKEN_PIECE_PATTERN.finditer(text):
+        used += _piece_tokens(m.group())
+        if used > max_tokens:
+            return text[:m.start()].rstrip() + " ..."
+    return text
+
+def prepare_input(text: str, max_tokens: int) -> str:
+    """The text an LLM prompt actually gets: no markup or feed boilerplate, within a token budget."""
+    return truncate_to_tokens(strip_boilerplate(clean_text(text)), max_tokens)
@@ -0,0 +1,228 @@
+import asyncio
+import copy
+import logging
+import os
+import socket
+import sys
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from app.core.config import settings
+from app.db.models import IngestionLog, IngestionRunItem
+from app.services.checkpoint import CLAIMED, PENDING
+
+logger = logging.getLogger(__name__)
+
+CLAIM_POLL_SECONDS = 1.0 # How often idle workers and the coordinator look at the queue
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """
+    The pending items of a sharded ingestion run, as a work queue.
+
+    The queue is the run's checkpoint (ingestion_run_items): the coordinator
+    marks deduplicated items pending as usual, and worker processes (on this
+    host or others) claim them in fetch order with
+    UPDATE ... WHERE url IN (SELECT ... FOR UPDATE SKIP LOCKED), so concurrent
+    claims never wait on or overlap each other. Claimed items move on to
+    enriched/written through RunCheckpoint like in an in-process run.
+
+    An item is claimed at most INGESTION_CLAIM_ATTEMPTS times: a claim whose
+    worker stopped refreshing it (keep_claims) for
+    INGESTION_CLAIM_TIMEOUT_SECONDS (worker died or hung) or that failed is
+    put back for another worker. Items that keep failing stay pending and the
+    coordinator leaves the run PARTIAL, so --resume (or the scheduler's
+    auto-resume) gives them fresh attempts.
+    """
+
+    def __init__(self, db: Session, run_id: uuid.UUID, worker: Optional[str] = None):
+        self.db = db
+        self.run_id = run_id
+        self.worker = worker or worker_name()
+        self.claimed = 0
+
+    def available(self) -> bool:
+        """False if the work queue columns are missing (database/15_ingestion_work_queue_schema.sql not applied yet)."""
+        try:
+            self.db.query(IngestionRunItem.claimed_by).filter(IngestionRunItem.run_id == self.run_id).limit(1).all()
+            return True
+        except Exception as e:
+            logger.warning(f"Ingestion work queue unavailable: {e}")
+            self.db.rollback()
+            return False
+
+    def claim(self, limit: int) -> list:
+        """Takes up to `limit` pending items (fewer, or none, if other workers hold the rest); rows of url, position, raw, ai_result."""
+        claimable = (
+            select(IngestionRunItem.url)
+            .where(
+                IngestionRunItem.run_id == self.run_id,
+                IngestionRunItem.state == PENDING,
+                IngestionRunItem.attempts < settings.INGESTION_CLAIM_ATTEMPTS,
+            )
+            .order_by(IngestionRunItem.position)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(IngestionRunItem)
+            .where(IngestionRunItem.run_id == self.run_id, IngestionRunItem.url.in_(claimable.scalar_subquery()))
+            .values(state=CLAIMED, claimed_by=self.worker, claimed_at=func.now(), attempts=IngestionRunItem.attempts + 1)
+            .returning(IngestionRunItem.url, IngestionRunItem.position, IngestionRunItem.raw, IngestionRunItem.ai_result)
+        )
+        items = sorted(self.db.execute(stmt).all(), key=lambda item: item.position)
+        self.db.commit()
+        self.claimed += len(items)
+        return items
+
+    def release(self, urls: List[str]):
+        """Hands this worker's unfinished items back (their AI call failed)."""
+        if not urls:
+            return
+        self.db.execute(
+            update(IngestionRunItem)
+            .where(
+                IngestionRunItem.run_id == self.run_id,
+                IngestionRunItem.url.in_(urls),
+                IngestionRunItem.state == CLAIMED,
+                IngestionRunItem.claimed_by == self.worker,
+            )
+            .values(state=PENDING)
+        )
+        self.db.commit()
+
+    def heartbeat(self) -> int:
+        """Refreshes claimed_at of every item this worker still holds; returns how many."""
+        touched = self.db.execute(
+            update(IngestionRunItem)
+            .where(
+                IngestionRunItem.run_id == self.run_id,
+                IngestionRunItem.state == CLAIMED,
+                IngestionRunItem.claimed_by == self.worker,
+            )
+            .values(claimed_at=func.now())
+        ).rowcount
+        self.db.commit()
+        return touched
+
+    async def keep_claims(self):
+        """
+        Heartbeat for a live worker: its claims waiting in the enrich queue or
+        behind a 429 cooldown must not go stale and be enriched twice.
+        """
+        while True:
+            await asyncio.sleep(settings.INGESTION_CLAIM_TIMEOUT_SECONDS / 3)
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logger.error(f"Failed to refresh claims of worker {self.worker}: {e}")
+                self.db.rollback()
+
+    def requeue(self, urls: List[str]):
+        """Puts items back in the queue with fresh attempts (a resumed run's unfinished items)."""
+        chunk = settings.DEDUP_QUERY_CHUNK
+        for i in range(0, len(urls), chunk):
+            self.db.execute(
+                update(IngestionRunItem)
+                .where(IngestionRunItem.run_id == self.run_id, IngestionRunItem.url.in_(urls[i:i + chunk]))
+                .values(state=PENDING, claimed_by=None, claimed_at=None, attempts=0)
+            )
+        self.db.commit()
+
+    def requeue_stale(self) -> int:
+        """Puts back claims not refreshed for INGESTION_CLAIM_TIMEOUT_SECONDS; returns how many."""
+        timeout = timedelta(seconds=settings.INGESTION_CLAIM_TIMEOUT_SECONDS)
+        requeued = self.db.execute(
+            update(IngestionRunItem)
+            .where(
+                IngestionRunItem.run_id == self.run_id,
+                IngestionRunItem.state == CLAIMED,
+                IngestionRunItem.claimed_at < func.now() - timeout,
+            )
+            .values(state=PENDING, claimed_by=None, claimed_at=None)
+        ).rowcount
+        self.db.commit()
+        if requeued:
+            logger.warning(f"Requeued {requeued} items whose worker stopped responding")
+        return requeued
+
+    def outstanding(self) -> Tuple[int, int]:
+        """(items still claimable, items held by a worker)."""
+        claimable = (IngestionRunItem.state == PENDING) & (IngestionRunItem.attempts < settings.INGESTION_CLAIM_ATTEMPTS)
+        row = (
+            self.db.query(func.count().filter(claimable), func.count().filter(IngestionRunItem.state == CLAIMED))
+            .filter(IngestionRunItem.run_id == self.run_id)
+            .one()
+        )
+        self.db.commit()
+        return row[0], row[1]
+
+    def is_open(self) -> bool:
+        """True while the coordinator may still add items (it is deduplicating, or the run is still going)."""
+        status, metadata = self.db.query(IngestionLog.status, IngestionLog.job_metadata).filter(IngestionLog.id == self.run_id).one()
+        self.db.commit()
+        return status == "PARTIAL" and not ((metadata or {}).get("work_queue") or {}).get("closed")
+
+    def report(self, stats: dict):
+        """Adds this worker's stats to the run's IngestionLog (row-locked: workers finish concurrently)."""
+        log_entry = self.db.query(IngestionLog).filter(IngestionLog.id == self.run_id).with_for_update().one()
+        metadata = copy.deepcopy(log_entry.job_metadata or {})
+        metadata.setdefault("workers", {})[self.worker] = stats
+        log_entry.job_metadata = metadata
+        flag_modified(log_entry, "job_metadata")
+        self.db.commit()
+
+    async def wait(self, processes: List[asyncio.subprocess.Process]) -> int:
+        """
+        Waits until every item is done; returns the number still claimable if
+        all local workers exited first (crashed), for the caller to finish.
+        Claims held by workers elsewhere are waited for until they go stale.
+        """
+        while True:
+            self.requeue_stale()
+            claimable, held = self.outstanding()
+            if not claimable and not held:
+                return 0
+            if claimable and all(p.returncode is not None for p in processes):
+                return claimable
+            await asyncio.sleep(CLAIM_POLL_SECONDS)
+
+def open_run(db: Session) -> Optional[IngestionLog]:
+    """The most recent sharded run still in progress, for workers started without a run id."""
+    return (
+        db.query(IngestionLog)
+        .filter(IngestionLog.status == "PARTIAL", IngestionLog.job_metadata.has_key("work_queue"))
+        .order_by(IngestionLog.run_at.desc())
+        .first()
+    )
+
+async def spawn_workers(run_id: uuid.UUID, count: int) -> List[asyncio.subprocess.Process]:
+    """Starts `count` local `run_ingestion.py --worker RUN_ID` processes."""
+    script = os.path.join(BACKEND_DIR, "run_ingestion.py")
+    return [
+        await asyncio.create_subprocess_exec(sys.executable, script, "--worker", str(run_id), cwd=BACKEND_DIR)
+        for _ in range(count)
+    ]
+
+def merge_worker_stats(workers: Dict[str, dict]) -> Dict[str, dict]:
+    """Run-level "ai" and "writes" totals from the per-worker stats."""
+    ai = {"workers": len(workers), "calls": 0, "failed": 0, "articles": 0, "llm_requests": 0, "batch_fallbacks": 0, "batch_failed": 0,
+          "tokens": {}, "quote_prefilter": {"asked": 0, "skipped": 0, "prompt_tokens_saved": 0}}
+    writes = {"inserted": 0, "duplicates": 0, "failed": 0, "flushes": 0}
+    for stats in workers.values():
+        for key in ("calls", "failed", "articles", "llm_requests", "batch_fallbacks", "batch_failed"):
+            ai[key] += (stats.get("ai") or {}).get(key) or 0
+        for kind, tokens in ((stats.get("ai") or {}).get("tokens") or {}).items():
+            ai["tokens"][kind] = ai["tokens"].get(kind, 0) + tokens
+        for key in ai["quote_prefilter"]:
+            ai["quote_prefilter"][key] += ((stats.get("ai") or {}).get("quote_prefilter") or {}).get(key) or 0
+        for key in writes:
+            writes[key] += (stats.get("writes") or {}).get(key) or 0
+    return {"ai": ai, "writes": writes}
@@ -0,0 +1,35 @@
+"""
+Signs stored articles for near-duplicate detection (database/12_near_dup_schema.sql).
+
+New articles are signed as they are ingested; run this once after applying the
+migration so the articles already in the window are matched against too.
+
+Usage:
+    python backfill_signatures.py --days 3
+"""
+import os
+import sys
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.near_dup import NearDupIndex
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill MinHash signatures for stored articles")
+    parser.add_argument("--days", type=int, default=settings.NEAR_DUP_WINDOW_DAYS, help="Sign articles created in the last N days")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        signed = NearDupIndex(db).backfill(args.days)
+        print(f"Signed {signed} articles from the last {args.days} days.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
@@ -0,0 +1,88 @@
+"""
+Benchmark: substring keyword scan vs. the TF-IDF KeywordClassifier used by the "simple" AI provider.
+
+Labels are the categories already stored on Article rows (assigned by the LLM
+providers). Reports accuracy, per-category recall and throughput. Needs a
+reachable Postgres (DATABASE_URL); nothing is written.
+
+Usage:
+    python benchmark_classifier.py --limit 2000 --repeat 5
+"""
+import sys
+import os
+import time
+import argparse
+from collections import Counter
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.session import SessionLocal
+from app.db.models import Article
+from app.services.ai import MOCK_SUMMARY_PREFIX
+from app.services.classifier import CATEGORIES, KeywordClassifier
+
+
+def substring_category(title: str, content: str) -> str:
+    """The categorization _process_simple used before the classifier."""
+    text = (title + " " + content).lower()
+    if any(w in text for w in ["ai", "llm", "gpt", "model", "transformer", "neural", "robot"]):
+        return "AI"
+    elif any(w in text for w in ["software", "code", "dev", "api", "framework", "react", "python"]):
+        return "Software Engineering"
+    elif any(w in text for w in ["computer", "algorithm", "system", "database", "network"]):
+        return "Computer Science"
+    return "Research"
+
+
+def load_sample(limit: int):
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Article.title, Article.original_snippet, Article.category)
+            .filter(Article.category.in_(CATEGORIES), ~Article.summary.startswith(MOCK_SUMMARY_PREFIX))
+            .order_by(Article.published_at.desc())
+            .limit(limit)
+            .all()
+        )
+    finally:
+        db.close()
+    return [(r.title or "", r.original_snippet or "") for r in rows], [r.category for r in rows]
+
+
+def evaluate(name: str, predict, articles: list, labels: list, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        predicted = predict(articles)
+    elapsed = (time.perf_counter() - started) / repeat
+
+    correct = sum(p == l for p, l in zip(predicted, labels))
+    recall = {}
+    for category in CATEGORIES:
+        total = sum(1 for l in labels if l == category)
+        hits = sum(1 for p, l in zip(predicted, labels) if l == category and p == category)
+        recall[category] = f"{hits / total:.0%}" if total else "-"
+    print(f"{name:>24} | {correct / len(labels):>8.1%} | {len(articles) / elapsed:>12,.0f} | {recall}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark simple-provider categorization")
+    parser.add_argument("--limit", type=int, default=2000, help="Labelled articles to load")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    articles, labels = load_sample(args.limit)
+    if not articles:
+        print("No labelled articles found")
+        sys.exit(1)
+    print(f"{len(articles)} labelled articles: {dict(Counter(labels))}")
+    print(f"{'classifier':>24} | {'accuracy':>8} | {'articles/sec':>12} | recall per category")
+
+    default_idf = KeywordClassifier()
+    fitted_idf = KeywordClassifier()
+    fitted_idf.fit_idf(f"{title} {content}" for title, content in articles)
+
+    evaluate("substring scan", lambda batch: [substring_category(t, c) for t, c in batch], articles, labels, args.repeat)
+    evaluate("tf-idf, one per call", lambda batch: [default_idf.classify([a])[0] for a in batch], articles, labels, args.repeat)
+    evaluate("tf-idf, batched", default_idf.classify, articles, labels, args.repeat)
+    evaluate("tf-idf, fitted idf", fitted_idf.classify, articles, labels, args.repeat)
@@ -0,0 +1,103 @@
+"""
+Benchmark: per-article dedup SELECTs vs. batch dedup (set-based query + Bloom filter).
+
+Needs a reachable Postgres (DATABASE_URL). Synthetic articles are inserted
+inside a transaction that is rolled back at the end, so the database is left
+untouched.
+
+Usage:
+    python benchmark_dedup.py --candidates 5000 --known-ratio 0.8
+"""
+import sys
+import os
+import time
+import uuid
+import argparse
+from datetime import datetime, timezone
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from app.db.session import engine
+from app.db.models import Article
+from app.services.dedup import UrlDeduplicator, existing_values
+from app.services.ingestion import slugify
+
+
+class RoundTripCounter:
+    def __init__(self, conn):
+        self.count = 0
+        event.listen(conn, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def per_row_dedup(db: Session, candidates: list) -> int:
+    """The original pipeline: one SELECT per URL, one more per new slug."""
+    new = 0
+    for raw in candidates:
+        if db.query(Article).filter(Article.url == raw["url"]).first():
+            continue
+        db.query(Article).filter(Article.slug == slugify(raw["title"])).first()
+        new += 1
+    return new
+
+
+def batch_dedup(db: Session, candidates: list, dedup: UrlDeduplicator) -> int:
+    known = dedup.known_urls(db, [raw["url"] for raw in candidates])
+    new_raw = [raw for raw in candidates if raw["url"] not in known]
+    existing_values(db, Article.slug, [slugify(raw["title"]) for raw in new_raw])
+    return len(new_raw)
+
+
+def run_benchmark(total: int, known_ratio: float):
+    run_id = uuid.uuid4().hex[:8]
+    known_count = int(total * known_ratio)
+    candidates = [
+        {"url": f"https://bench.example.com/{run_id}/{i}", "title": f"Benchmark story {run_id} {i}"}
+        for i in range(total)
+    ]
+
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            db = Session(bind=conn)
+            now = datetime.now(timezone.utc)
+            db.execute(insert(Article), [
+                {
+                    "id": uuid.uuid4(), "title": raw["title"], "slug": slugify(raw["title"]), "url": raw["url"],
+                    "source": "Benchmark", "category": "Research", "published_at": now,
+                }
+                for raw in candidates[:known_count]
+            ])
+
+            counter = RoundTripCounter(conn)
+            dedup = UrlDeduplicator()
+            print(f"{total} candidates, {known_count} already ingested")
+            print(f"{'strategy':>29} | {'new':>5} | {'round trips':>11} | {'ms':>8}")
+
+            runs = (
+                ("per-row SELECT", lambda: per_row_dedup(db, candidates)),
+                ("batch (cold Bloom)", lambda: batch_dedup(db, candidates, dedup)),
+                ("batch (warm Bloom, same run)", lambda: batch_dedup(db, candidates, dedup)),
+            )
+            for name, fn in runs:
+                counter.count = 0
+                started = time.perf_counter()
+                new = fn()
+                elapsed = (time.perf_counter() - started) * 1000
+                print(f"{name:>29} | {new:>5} | {counter.count:>11} | {elapsed:>8.1f}")
+        finally:
+            trans.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingestion URL deduplication")
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--known-ratio", type=float, default=0.8)
+    args = parser.parse_args()
+
+    run_benchmark(args.candidates, args.known_ratio)
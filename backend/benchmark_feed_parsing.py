@@ -0,0 +1,101 @@
+"""
+Benchmark: event-loop latency while a large Arxiv feed is parsed.
+
+Runs a 10ms ticker on the loop and measures how late each tick fires while
+the feed is parsed inline, in a thread pool and in a process pool.
+
+Usage:
+    python benchmark_feed_parsing.py --entries 2000
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.parsing import parse_arxiv_feed
+
+TICK = 0.01
+
+
+def build_arxiv_feed(entries: int) -> bytes:
+    items = []
+    for i in range(entries):
+        abstract = " ".join(f"We study transformer variant {i} on benchmark {j}." for j in range(20))
+        items.append(f"""
+  <entry>
+    <id>http://arxiv.org/abs/2401.{i:05d}v1</id>
+    <published>2024-01-15T12:00:00Z</published>
+    <title>Paper number {i}: scaling laws for agents</title>
+    <summary>{abstract}</summary>
+    <author><name>Author {i}</name></author>
+    <category term="cs.AI"/>
+  </entry>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>ArXiv Query</title>{''.join(items)}
+</feed>""".encode()
+
+
+async def measure(content: bytes, executor) -> dict:
+    loop = asyncio.get_running_loop()
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            expected = loop.time() + TICK
+            await asyncio.sleep(TICK)
+            lags.append(max(0.0, loop.time() - expected))
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK * 2) # Let the ticker settle
+
+    started = time.perf_counter()
+    if executor is None:
+        entries = parse_arxiv_feed(content)
+    else:
+        entries = await loop.run_in_executor(executor, parse_arxiv_feed, content)
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    await tick_task
+
+    lags.sort()
+    return {
+        "entries": len(entries),
+        "parse_s": elapsed,
+        "max_lag_ms": lags[-1] * 1000 if lags else 0.0,
+        "p95_lag_ms": lags[int(len(lags) * 0.95) - 1] * 1000 if len(lags) > 1 else 0.0,
+    }
+
+
+async def run_benchmark(entries: int):
+    content = build_arxiv_feed(entries)
+    print(f"Arxiv feed: {entries} entries, {len(content) / 1024:.0f} KiB")
+    print(f"{'executor':>8} | {'entries':>7} | {'parse s':>7} | {'max lag ms':>10} | {'p95 lag ms':>10}")
+
+    thread_pool = ThreadPoolExecutor(max_workers=1)
+    process_pool = ProcessPoolExecutor(max_workers=1)
+    # Warm the process pool so worker start-up is not counted
+    await asyncio.get_running_loop().run_in_executor(process_pool, parse_arxiv_feed, build_arxiv_feed(1))
+
+    try:
+        for name, executor in (("inline", None), ("thread", thread_pool), ("process", process_pool)):
+            r = await measure(content, executor)
+            print(f"{name:>8} | {r['entries']:>7} | {r['parse_s']:>7.2f} | {r['max_lag_ms']:>10.1f} | {r['p95_lag_ms']:>10.1f}")
+    finally:
+        thread_pool.shutdown()
+        process_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark feed parsing executors")
+    parser.add_argument("--entries", type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.entries))
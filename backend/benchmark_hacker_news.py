@@ -0,0 +1,100 @@
+"""
+Benchmark for ContentFetcher.fetch_hacker_news against a local stub HN API.
+
+Usage:
+    python benchmark_hacker_news.py --limit 200 --latency-ms 50
+"""
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.sources import ContentFetcher
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256 # Default of 5 would throttle the high-concurrency runs
+
+
+def make_handler(latency: float, error_rate: float):
+    class StubHNHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, so pool reuse is measurable
+        disable_nagle_algorithm = True
+        def log_message(self, format, *args):
+            pass # Keep benchmark output clean
+
+        def _send_json(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == "/v0/topstories.json":
+                return self._send_json(list(range(1, 501)))
+
+            if self.path.startswith("/v0/item/"):
+                if random.random() < error_rate:
+                    return self._send_json({"error": "injected"}, status=500)
+                item_id = int(self.path.rsplit("/", 1)[-1].split(".")[0])
+                return self._send_json({
+                    "id": item_id,
+                    "title": f"Stub story {item_id}",
+                    "url": f"https://example.com/story/{item_id}",
+                    "time": 1700000000 + item_id,
+                })
+
+            self._send_json(None, status=404)
+
+    return StubHNHandler
+
+
+def start_stub_server(latency: float, error_rate: float) -> ThreadingHTTPServer:
+    server = StubServer(("127.0.0.1", 0), make_handler(latency, error_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_benchmark(limit: int, levels: list, latency: float, error_rate: float):
+    server = start_stub_server(latency, error_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v0"
+    fetcher = ContentFetcher(hn_base_url=base_url)
+
+    print(f"Stub HN at {base_url} | limit={limit} latency={latency * 1000:.0f}ms error_rate={error_rate:.0%}")
+    print(f"{'concurrency':>11} | {'items':>5} | {'seconds':>7} | {'items/sec':>9} | {'reuse':>5}")
+    try:
+        for concurrency in levels:
+            async with fetcher.session(per_host_connections=concurrency) as http:
+                started = time.perf_counter()
+                stories = await fetcher.fetch_hacker_news(limit=limit, concurrency=concurrency)
+                elapsed = time.perf_counter() - started
+            reuse = http.stats()["reuse_ratio"]
+            print(f"{concurrency:>11} | {len(stories):>5} | {elapsed:>7.2f} | {len(stories) / elapsed:>9.1f} | {reuse:>5.0%}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Hacker News fan-out fetching")
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR) # Injected item errors are expected, don't print them
+
+    asyncio.run(run_benchmark(args.limit, args.concurrency, args.latency_ms / 1000, args.error_rate))
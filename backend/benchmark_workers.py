@@ -0,0 +1,207 @@
+"""
+Scaling benchmark for sharded ingestion (run_ingestion.py --workers N).
+
+Runs the same feeds once per worker count, each as a real coordinator process
+with N worker processes, against local stubs: feeds come from a fixture
+directory (synthetic, or recorded with `benchmark_pipeline.py --record DIR`)
+and the LLM is stub_llm_server.py. Reports articles/sec and the speedup over
+the first worker count, and how evenly the work queue spread the items.
+
+Workers are separate processes, so unlike benchmark_pipeline.py the runs
+commit for real. Needs a reachable Postgres (DATABASE_URL) with
+database/13_ingestion_checkpoint_schema.sql and
+database/15_ingestion_work_queue_schema.sql applied, and no other ingestion
+run holding the lease. Everything a run wrote (articles, quotes, polls, feed
+validators, its log) is deleted before the next one, and the benchmark
+sources at the end.
+
+Usage:
+    python benchmark_workers.py --feeds 8 --items 25 --llm-latency-ms 800
+    python benchmark_workers.py --fixtures fixtures/feeds --workers 1,2,4,8 --concurrency 2
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import logging
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from stub_llm_server import start_stub_server
+from benchmark_pipeline import start_fixture_server, synthesize_fixtures
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def create_sources(manifest: list, feed_base: str) -> list:
+    from app.db.session import SessionLocal
+    from app.db.models import IngestionSource
+
+    db = SessionLocal()
+    try:
+        source_ids = []
+        for entry in manifest:
+            source_id = f"bench-{entry['id']}"
+            db.merge(IngestionSource(id=source_id, type=entry["type"], url=f"{feed_base}/{entry['path']}",
+                                     item_limit=entry["item_limit"], poll_interval_minutes=60, enabled=True))
+            source_ids.append(source_id)
+        db.commit()
+        return source_ids
+    finally:
+        db.close()
+
+
+def run_once(source_ids: list, workers: int) -> tuple:
+    """One coordinator process with `workers` worker processes; returns (log metadata row, elapsed)."""
+    from app.db.session import SessionLocal
+    from app.db.models import IngestionLog
+
+    started_at = datetime.now(timezone.utc)
+    command = [sys.executable, os.path.join(BACKEND_DIR, "run_ingestion.py"), "--workers", str(workers)]
+    for source_id in source_ids:
+        command += ["--source", source_id]
+    started = time.perf_counter()
+    subprocess.run(command, cwd=BACKEND_DIR, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    try:
+        log_entry = (
+            db.query(IngestionLog)
+            .filter(IngestionLog.run_at >= started_at)
+            .order_by(IngestionLog.run_at.desc())
+            .first()
+        )
+        if not log_entry:
+            return None, elapsed
+        return {"id": log_entry.id, "status": log_entry.status, "added": log_entry.articles_added or 0,
+                "metadata": dict(log_entry.job_metadata or {})}, elapsed
+    finally:
+        db.close()
+
+
+def clean_up(run_id, feed_base: str, active_polls: list, bench_started: datetime):
+    """Deletes what a run wrote, so the next worker count ingests the same items from scratch."""
+    from app.db.session import SessionLocal
+    from app.db.models import Article, ArticleDuplicate, FeedValidator, IngestionLog, IngestionRunItem, Poll, Quote
+
+    db = SessionLocal()
+    try:
+        urls = [row.url for row in db.query(IngestionRunItem.url).filter(IngestionRunItem.run_id == run_id).all()]
+        for start in range(0, len(urls), 1000):
+            chunk = urls[start:start + 1000]
+            db.query(Quote).filter(Quote.source_url.in_(chunk)).delete(synchronize_session=False)
+            db.query(ArticleDuplicate).filter(ArticleDuplicate.url.in_(chunk)).delete(synchronize_session=False)
+            # Signatures and duplicates pointing at these articles go with them (ON DELETE CASCADE)
+            db.query(Article).filter(Article.url.in_(chunk)).delete(synchronize_session=False)
+        db.query(IngestionLog).filter(IngestionLog.id == run_id).delete(synchronize_session=False)
+        db.query(FeedValidator).filter(FeedValidator.url.startswith(feed_base)).delete(synchronize_session=False)
+        db.query(Poll).filter(Poll.created_at >= bench_started).delete(synchronize_session=False)
+        if active_polls:
+            db.query(Poll).filter(Poll.id.in_(active_polls)).update({Poll.is_active: True}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def drop_sources(source_ids: list):
+    from app.db.session import SessionLocal
+    from app.db.models import IngestionSource
+
+    db = SessionLocal()
+    try:
+        db.query(IngestionSource).filter(IngestionSource.id.in_(source_ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def report(results: list):
+    base = next((r for r in results if r["rate"]), None)
+    print(f"\n{'workers':>7} | {'status':>7} | {'articles':>8} | {'elapsed s':>9} | {'articles/s':>10} | "
+          f"{'speedup':>7} | {'LLM req':>7} | {'claimed per worker':>18}")
+    for r in results:
+        speedup = f"{r['rate'] / base['rate']:.2f}x" if base and r["rate"] else "-"
+        claimed = "/".join(str(w.get("claimed", 0)) for w in r["worker_stats"].values()) or "-"
+        print(f"{r['workers']:>7} | {r['status']:>7} | {r['added']:>8} | {r['elapsed']:>9.2f} | {r['rate']:>10.2f} | "
+              f"{speedup:>7} | {r['llm_requests']:>7} | {claimed:>18}")
+    print("(elapsed includes process start-up and fetching, which do not shard; speedup is against the first row)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sharded ingestion at several worker counts with a stub LLM")
+    parser.add_argument("--fixtures", help="Replay fixtures recorded with benchmark_pipeline.py --record instead of synthetic feeds")
+    parser.add_argument("--feeds", type=int, default=8, help="Synthetic RSS feeds")
+    parser.add_argument("--items", type=int, default=25, help="Items per synthetic feed")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts (0 = in-process)")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=None, help="Override AI_BATCH_SIZE")
+    parser.add_argument("--concurrency", type=int, default=None, help="Override AI_CONCURRENCY (per worker)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    worker_counts = [int(n) for n in args.workers.split(",")]
+
+    llm = start_stub_server(latency=args.llm_latency_ms / 1000, rate_429=args.rate_429)
+    # Read by the coordinator and worker processes, which inherit this environment
+    os.environ.update({
+        "AI_PROVIDER": "stub",
+        "AI_STUB_URL": f"http://127.0.0.1:{llm.server_address[1]}/v1",
+        "AI_RATE_LIMIT_RPM": "0",
+        "AI_RATE_LIMIT_BACKOFF": "1",
+        "LLM_CACHE_ENABLED": "false", # Every run should reach the stub
+        "NEAR_DUP_ENABLED": "false", # Synthetic items share their sentences
+    })
+    if args.batch_size:
+        os.environ["AI_BATCH_SIZE"] = str(args.batch_size)
+    if args.concurrency:
+        os.environ["AI_CONCURRENCY"] = str(args.concurrency)
+
+    if args.fixtures:
+        fixture_dir = args.fixtures
+        with open(os.path.join(fixture_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    else:
+        fixture_dir = tempfile.mkdtemp(prefix="bench-feeds-")
+        manifest = synthesize_fixtures(fixture_dir, args.feeds, args.items)
+
+    feeds = start_fixture_server(fixture_dir)
+    feed_base = f"http://127.0.0.1:{feeds.server_address[1]}"
+    print(f"Feeds from {fixture_dir} at {feed_base} | llm_latency={args.llm_latency_ms:.0f}ms "
+          f"rate_429={args.rate_429:.0%} | workers {worker_counts}")
+
+    from app.db.session import SessionLocal
+    from app.db.models import Poll
+    db = SessionLocal()
+    active_polls = [row.id for row in db.query(Poll.id).filter(Poll.is_active == True).all()]
+    db.close()
+
+    bench_started = datetime.now(timezone.utc)
+    source_ids = create_sources(manifest, feed_base)
+    results = []
+    try:
+        for workers in worker_counts:
+            requests_before = llm.stats()["requests"]
+            run, elapsed = run_once(source_ids, workers)
+            if not run:
+                print(f"workers={workers}: no run recorded (another worker holds the ingestion lease?)")
+                continue
+            clean_up(run["id"], feed_base, active_polls, bench_started)
+            results.append({
+                "workers": workers,
+                "status": run["status"],
+                "added": run["added"],
+                "elapsed": elapsed,
+                "rate": run["added"] / elapsed if elapsed else 0,
+                "llm_requests": llm.stats()["requests"] - requests_before,
+                "worker_stats": run["metadata"].get("workers") or {},
+            })
+    finally:
+        drop_sources(source_ids)
+    report(results)
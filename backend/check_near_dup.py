@@ -0,0 +1,47 @@
+"""
+Checks the near-duplicate index (app/services/near_dup.py) on known pairs,
+without a database: distinct stories with similar headlines must be kept,
+retellings of one story must be caught at NEAR_DUP_THRESHOLD.
+
+Usage:
+    python check_near_dup.py
+"""
+import os
+import sys
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.near_dup import minhash, shingles, similarity, story_words
+
+LEDE = (
+    "OpenAI on Tuesday released GPT-5, its most capable model so far, to paying ChatGPT users and developers. "
+    "The company says the model makes fewer factual errors, follows long instructions more reliably and is "
+    "cheaper to run than its predecessor, with API pricing cut by half for most workloads."
+)
+
+# (title a, content a, title b, content b, same story?)
+PAIRS = [
+    ("OpenAI releases GPT-5", "", "OpenAI releases GPT-5 mini", "", False),
+    ("Show HN: A tiny web framework in Rust", "", "Show HN: A tiny web server in Rust", "", False),
+    ("Ask HN: How do you review AI-generated code?", "", "Ask HN: How do you test AI-generated code?", "", False),
+    ("Rust 1.80 released", "", "Rust 1.81 released", "", False),
+    ("OpenAI releases GPT-5", "", "OpenAI Releases GPT-5!", "", True),
+    ("OpenAI releases GPT-5", LEDE, "GPT-5 is here: OpenAI ships its new model", LEDE + " Read more at the source.", True),
+]
+
+def score(title_a, content_a, title_b, content_b) -> float:
+    a = minhash(shingles(story_words(title_a, content_a)))
+    b = minhash(shingles(story_words(title_b, content_b)))
+    return float(similarity(a[None, :], b[None, :])[0, 0])
+
+if __name__ == "__main__":
+    failures = 0
+    print(f"threshold {settings.NEAR_DUP_THRESHOLD}")
+    for title_a, content_a, title_b, content_b, same in PAIRS:
+        value = score(title_a, content_a, title_b, content_b)
+        ok = (value >= settings.NEAR_DUP_THRESHOLD) == same
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {value:.2f} {'dup ' if same else 'keep'} | {title_a!r} vs {title_b!r}")
+    sys.exit(1 if failures else 0)
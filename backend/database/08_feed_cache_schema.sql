@@ -0,0 +1,13 @@
+-- 8. Feed Validators (Conditional GET cache)
+-- Remembers ETag / Last-Modified and a body hash per polled feed so unchanged feeds are not re-parsed
+
+CREATE TABLE IF NOT EXISTS feed_validators (
+    url TEXT PRIMARY KEY, -- Full request URL including query string
+    etag TEXT,
+    last_modified TEXT,
+    content_hash VARCHAR(64), -- sha256 of the last parsed body
+    content_length INTEGER DEFAULT 0, -- Bytes of the last body (used to report bandwidth saved on 304)
+    checked_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+COMMENT ON TABLE feed_validators IS 'HTTP validators for RSS/Arxiv feeds, used by the ingestion job to skip unchanged feeds';
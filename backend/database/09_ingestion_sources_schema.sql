@@ -0,0 +1,25 @@
+-- 9. Ingestion Sources (Source Registry)
+-- One row per polled source; the scheduler polls each enabled source on its own interval
+
+CREATE TABLE IF NOT EXISTS ingestion_sources (
+    id TEXT PRIMARY KEY, -- e.g. 'hacker-news', 'techcrunch-ai'
+    type TEXT NOT NULL CHECK (type IN ('arxiv', 'hacker_news', 'rss')),
+    url TEXT NOT NULL,
+    item_limit INTEGER DEFAULT 10,
+    poll_interval_minutes INTEGER DEFAULT 120,
+    concurrency INTEGER, -- Max in-flight requests within the source (HN item fan-out)
+    enabled BOOLEAN DEFAULT TRUE,
+    options JSONB, -- Type-specific settings, e.g. {"search_query": "cat:cs.AI"} for Arxiv
+    last_polled_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Seed with the sources the pipeline used to hard-code
+INSERT INTO ingestion_sources (id, type, url, item_limit, poll_interval_minutes, concurrency, options) VALUES
+    ('arxiv', 'arxiv', 'https://export.arxiv.org/api/query', 10, 240, NULL, '{"search_query": "cat:cs.AI OR cat:cs.SE"}'),
+    ('hacker-news', 'hacker_news', 'https://hacker-news.firebaseio.com/v0', 10, 30, 8, NULL),
+    ('techcrunch-ai', 'rss', 'https://techcrunch.com/category/artificial-intelligence/feed/', 10, 60, NULL, NULL),
+    ('the-verge', 'rss', 'https://www.theverge.com/rss/index.xml', 10, 60, NULL, NULL),
+    ('openai-blog', 'rss', 'https://openai.com/blog/rss.xml', 10, 240, NULL, NULL)
+ON CONFLICT (id) DO NOTHING;
+
+COMMENT ON TABLE ingestion_sources IS 'Declarative registry of content sources polled by the ingestion scheduler';
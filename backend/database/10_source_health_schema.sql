@@ -0,0 +1,11 @@
+-- 10. Source Health / Circuit Breaker
+-- Tracks failures and latency per ingestion source so dead feeds are skipped for a back-off window
+
+ALTER TABLE ingestion_sources ADD COLUMN IF NOT EXISTS consecutive_failures INTEGER DEFAULT 0;
+ALTER TABLE ingestion_sources ADD COLUMN IF NOT EXISTS last_success_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE ingestion_sources ADD COLUMN IF NOT EXISTS last_failure_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE ingestion_sources ADD COLUMN IF NOT EXISTS last_error TEXT;
+ALTER TABLE ingestion_sources ADD COLUMN IF NOT EXISTS avg_latency_ms INTEGER; -- Rolling (EWMA) fetch latency
+ALTER TABLE ingestion_sources ADD COLUMN IF NOT EXISTS circuit_open_until TIMESTAMP WITH TIME ZONE; -- Source is skipped until then
+
+COMMENT ON COLUMN ingestion_sources.circuit_open_until IS 'Circuit breaker: scheduled runs skip the source until this time, then probe it once';
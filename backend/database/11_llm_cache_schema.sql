@@ -0,0 +1,17 @@
+-- 11. LLM Response Cache
+-- Parsed AI responses keyed by task, model, prompt version and normalized content hash
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key VARCHAR(64) PRIMARY KEY, -- sha256 of (task, model, prompt version, content hash)
+    task TEXT NOT NULL, -- 'process_article', 'extract_quote', 'generate_poll'
+    model TEXT NOT NULL,
+    response JSONB NOT NULL,
+    hits INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires_at ON llm_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache(created_at);
+
+COMMENT ON TABLE llm_cache IS 'Persistent tier of the AIService response cache; pruned by TTL and row cap after each ingestion run';
@@ -0,0 +1,26 @@
+-- 12. Near-Duplicate Story Detection
+-- MinHash signatures per article, LSH band keys for sub-linear lookup, and the items folded into a canonical article
+
+CREATE TABLE IF NOT EXISTS article_signatures (
+    article_id UUID PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE,
+    minhash BIGINT[] NOT NULL,
+    bands TEXT[] NOT NULL, -- '<band>:<hash>' keys; two articles sharing one are compared
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_signatures_bands ON article_signatures USING GIN (bands);
+CREATE INDEX IF NOT EXISTS idx_article_signatures_created_at ON article_signatures(created_at);
+
+CREATE TABLE IF NOT EXISTS article_duplicates (
+    url TEXT PRIMARY KEY,
+    canonical_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    source TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_article_duplicates_canonical_id ON article_duplicates(canonical_id);
+
+COMMENT ON TABLE article_signatures IS 'Written for every stored article; new candidates are matched against the last NEAR_DUP_WINDOW_DAYS before AI processing';
+COMMENT ON TABLE article_duplicates IS 'Near-duplicate items skipped at ingestion, attached to the article they retell';
@@ -0,0 +1,16 @@
+-- 13. Ingestion Run Checkpoints
+-- Per-item progress of each ingestion run, so an interrupted run resumes instead of starting over
+
+CREATE TABLE IF NOT EXISTS ingestion_run_items (
+    run_id UUID NOT NULL REFERENCES ingestion_logs(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    position INTEGER NOT NULL, -- fetch order
+    raw JSONB NOT NULL, -- the fetched item
+    state TEXT NOT NULL DEFAULT 'fetched', -- 'fetched', 'pending', 'skipped', 'enriched', 'written'
+    ai_result JSONB,
+    article_id UUID,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (run_id, url)
+);
+
+COMMENT ON TABLE ingestion_run_items IS 'Checkpoints for run_ingestion.py --resume/--replay; pruned after INGESTION_CHECKPOINT_RETENTION_DAYS';
@@ -0,0 +1,11 @@
+-- 14. Scheduler Leases
+-- Cross-worker lock so only one API worker / replica / cron job runs each scheduled job at a time
+
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name TEXT PRIMARY KEY, -- job name, e.g. 'ingestion'
+    holder TEXT NOT NULL, -- host:pid:nonce of the worker holding the lease
+    acquired_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+COMMENT ON TABLE scheduler_leases IS 'A lease row instead of an advisory lock: session-level locks do not survive a transaction-mode pooler';
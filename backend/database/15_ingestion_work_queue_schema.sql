@@ -0,0 +1,13 @@
+-- 15. Ingestion Work Queue
+-- Sharded runs (run_ingestion.py --workers N): worker processes claim pending checkpoint items
+-- with SELECT ... FOR UPDATE SKIP LOCKED, so each item is enriched and written by exactly one worker
+
+ALTER TABLE ingestion_run_items ADD COLUMN IF NOT EXISTS claimed_by TEXT; -- host:pid of the worker holding the item
+ALTER TABLE ingestion_run_items ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE ingestion_run_items ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0; -- claims so far
+
+-- Claims scan a run's pending items in fetch order
+CREATE INDEX IF NOT EXISTS idx_ingestion_run_items_claimable
+    ON ingestion_run_items (run_id, position) WHERE state = 'pending';
+
+COMMENT ON COLUMN ingestion_run_items.attempts IS 'Items are claimed at most INGESTION_CLAIM_ATTEMPTS times; the rest stay pending for --resume';
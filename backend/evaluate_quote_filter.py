@@ -0,0 +1,90 @@
+"""
+Measures the quote prefilter (app/services/quote_filter.py) against the quotes
+already stored.
+
+Every stored article from the window is scored from its title and stored
+snippet. Articles with a row in `quotes` count as positives. For each rule the
+report shows how many articles it would ask for a quote, its precision and
+recall, and the estimated prompt tokens saved: articles the rule does not pick
+get the enrichment prompt without the quote task (QUOTE_TASK).
+
+The snippet is only the first 500 characters of the content, so scores here
+are lower than in a run, which sees the full content. Read the numbers as a
+floor.
+
+Usage:
+    python evaluate_quote_filter.py --days 30
+    python evaluate_quote_filter.py --days 90 --min-score 20
+"""
+import os
+import sys
+import argparse
+from datetime import datetime, timedelta, timezone
+
+# Add backend to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.models import Article, Quote
+from app.services.ai import QUOTE_TASK
+from app.services.quote_filter import quote_score
+from app.services.text_prep import estimate_tokens
+
+# The old extract_quote rule: a quote was looked for in every title containing one of these
+TITLE_KEYWORDS = ["interview", "speech", "talk", "says", "warns", "predicts", "statement", "keynote"]
+
+
+def evaluate(quoted_urls: set, picked: set) -> dict:
+    hits = len(picked & quoted_urls)
+    return {
+        "asked": len(picked),
+        "hits": hits,
+        "precision": hits / len(picked) if picked else 0.0,
+        "recall": hits / len(quoted_urls) if quoted_urls else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precision of the quote prefilter against stored quotes")
+    parser.add_argument("--days", type=int, default=30, help="Articles created in the last N days")
+    parser.add_argument("--min-score", type=float, default=settings.QUOTE_MIN_SCORE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+        rows = db.query(Article.url, Article.title, Article.original_snippet, Article.created_at).filter(Article.created_at >= cutoff).all()
+        urls = [row.url for row in rows]
+        quoted_urls = set()
+        for start in range(0, len(urls), settings.DEDUP_QUERY_CHUNK):
+            chunk = urls[start:start + settings.DEDUP_QUERY_CHUNK]
+            quoted_urls |= {url for (url,) in db.query(Quote.source_url).filter(Quote.source_url.in_(chunk)).all()}
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    if not rows:
+        print(f"No articles in the last {args.days} days.")
+        sys.exit(0)
+
+    scores = {row.url: quote_score(row.title, row.original_snippet) for row in rows}
+    keyword_picks = {row.url for row in rows if any(k in (row.title or "").lower() for k in TITLE_KEYWORDS)}
+    threshold_picks = {url for url, score in scores.items() if score >= args.min_score}
+    quote_task_tokens = estimate_tokens(QUOTE_TASK)
+
+    print(f"{len(rows)} articles from the last {args.days} days, {len(quoted_urls)} with a stored quote")
+    print(f"\n{'rule':>28} | {'asked':>6} | {'hits':>5} | {'precision':>9} | {'recall':>6} | {'tokens saved':>12}")
+    for name, picked in [
+        ("ask every article", {row.url for row in rows}),
+        ("title keywords (old pass)", keyword_picks),
+        (f"prefilter score >= {args.min_score:g}", threshold_picks),
+    ]:
+        result = evaluate(quoted_urls, picked)
+        saved = (len(rows) - result["asked"]) * quote_task_tokens
+        print(f"{name:>28} | {result['asked']:>6} | {result['hits']:>5} | {result['precision']:>9.1%} | "
+              f"{result['recall']:>6.1%} | {saved:>12}")
+    print(f"(asked: articles whose enrichment prompt includes the quote task; saved: ~{quote_task_tokens} prompt tokens "
+          "per article without it, output tokens not counted)")
@@ -2,6 +2,7 @@ import sys
 import os
 import logging
 import asyncio
+import argparse
 
 # Python 3.13 Compatibility Shim for feedparser (requires cgi)
 if sys.version_info >= (3, 13):
@@ -25,15 +26,46 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from app.services.ingestion import run_ingestion_job
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ingestion pipeline once")
+    parser.add_argument("--source", dest="sources", action="append",
+                        help="Only poll this source id (repeatable). Default: all enabled sources")
+    parser.add_argument("--due-only", action="store_true",
+                        help="Only poll sources whose poll interval has elapsed")
+    parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Resume an interrupted run from its checkpoint (default: the most recent one)")
+    parser.add_argument("--replay", metavar="RUN_ID",
+                        help="Run the items a past run fetched through dedup, AI and writes again as a new run, "
+                             "without fetching. Articles already stored are skipped, not re-enriched or overwritten")
+    parser.add_argument("--workers", type=int, default=None, metavar="N",
+                        help="Shard enrichment and writes across N worker processes (default: INGESTION_WORKERS)")
+    parser.add_argument("--worker", nargs="?", const="latest", metavar="RUN_ID",
+                        help="Join a sharded run as a worker, e.g. on another host (default: the most recent one)")
+    args = parser.parse_args()
+    if args.resume and args.replay:
+        parser.error("--resume and --replay are mutually exclusive")
+    if args.worker and (args.resume or args.replay or args.sources or args.due_only or args.workers):
+        parser.error("--worker only takes a run id")
+
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     logger = logging.getLogger(__name__)
     
+    if args.worker:
+        from app.services.ingestion_worker import join_run
+        try:
+            asyncio.run(join_run(args.worker))
+        except Exception as e:
+            logger.error(f"--- Worker Failed: {e} ---")
+            sys.exit(1)
+        sys.exit(0)
+
     logger.info("--- Starting Daily Ingestion Job ---")
     try:
-        asyncio.run(run_ingestion_job())
+        asyncio.run(run_ingestion_job(due_only=args.due_only, source_ids=args.sources,
+                                      resume_run_id=args.resume, replay_run_id=args.replay,
+                                      workers=args.workers))
         logger.info("--- Job Finished Successfully ---")
     except Exception as e:
         logger.error(f"--- Job Failed: {e} ---")
@@ -0,0 +1,66 @@
+"""
+Dedicated scheduler worker: runs the background jobs (ingestion) outside the API.
+
+Start one or more of these and set SCHEDULER_IN_API=false for the API
+processes, so scaling the API (uvicorn/gunicorn workers, replicas) does not
+multiply the jobs. Each job holds a lease in scheduler_leases while it runs,
+so extra scheduler workers are standbys, not duplicates.
+
+Usage:
+    SCHEDULER_IN_API=false uvicorn app.main:app ...
+    python run_scheduler.py
+"""
+import sys
+import os
+import signal
+import logging
+import asyncio
+
+# Python 3.13 Compatibility Shim for feedparser (requires cgi)
+if sys.version_info >= (3, 13):
+    import types
+    import email.message
+
+    def parse_header(line):
+        if not line:
+            return ("", {})
+        m = email.message.Message()
+        m['content-type'] = line
+        return m.get_content_type(), m.get_params({}, failobj={}) or {}
+
+    cgi_dummy = types.ModuleType("cgi")
+    cgi_dummy.parse_header = parse_header
+    sys.modules.setdefault("cgi", cgi_dummy)
+
+# Ensure backend directory is in python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.scheduler import create_scheduler
+from app.services.parsing import shutdown_parse_executor
+
+logger = logging.getLogger(__name__)
+
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    scheduler = create_scheduler()
+    scheduler.start()
+    logger.info(f"Scheduler worker started. Due ingestion sources checked every {settings.INGESTION_TICK_MINUTES} minutes.")
+    await stop.wait()
+
+    logger.info("Stopping scheduler worker...")
+    # A running job is cancelled: its lease is released and its run stays PARTIAL,
+    # so the next tick (on any worker) resumes it from its checkpoint
+    scheduler.shutdown()
+    shutdown_parse_executor()
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+"""
+Local stub LLM server speaking the OpenAI chat completions API.
+
+Point the backend at it with AI_PROVIDER=stub (AI_STUB_URL defaults to
+http://127.0.0.1:8765/v1) to exercise the real provider code path offline:
+batching, JSON parsing, 429 cooldowns and model fallback.
+
+Responses are canned but shaped like the real thing: article analyses
+(single or batched), polls and quote extractions, chosen by looking at
+the prompt. GET /stats returns request counters.
+
+Usage:
+    python stub_llm_server.py --port 8765 --latency-ms 800 --rate-429 0.05 --malformed-rate 0.02
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CATEGORIES = ["AI", "Computer Science", "Software Engineering", "Research"]
+ITEM_ID_PATTERN = re.compile(r'"id":\s*"([^"]+)"')
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency: float, jitter: float, rate_429: float,
+                 malformed_rate: float, drop_rate: float, seed: int = 0):
+        super().__init__(address, StubLLMHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.malformed_rate = malformed_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "rate_limited": 0, "malformed": 0, "dropped_items": 0, "prompt_chars": 0}
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return self.random.random() < rate
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+
+def _pick(text: str, options: list):
+    """Deterministic choice, so the same article always gets the same answer."""
+    return options[int(hashlib.md5(text.encode()).hexdigest(), 16) % len(options)]
+
+
+def _analysis(key: str, with_quote: bool = True) -> dict:
+    analysis = {
+        "summary": f"Stub summary for {key[:60]}.\n\n**Why this matters:** Stub insight.",
+        "category": _pick(key, CATEGORIES),
+        "viability_score": _pick(key, list(range(20, 100, 5))),
+    }
+    # Only prompts that still carry the quote task get a quote
+    if with_quote:
+        analysis["quote"] = _pick(key, [None, None, None, {"text": f"Stub quote about {key[:40]}", "author": "Ada Stub", "role": "CEO, Stub Labs"}])
+    return analysis
+
+
+def answer(server: StubLLMServer, prompt: str) -> str:
+    """Canned JSON for whichever AIService prompt this is."""
+    with_quote = '"quote"' in prompt
+    if "Articles (JSON array" in prompt:
+        ids = ITEM_ID_PATTERN.findall(prompt)
+        kept = [item_id for item_id in ids if not server.roll(server.drop_rate)]
+        server.count("dropped_items", len(ids) - len(kept))
+        return json.dumps({"articles": [dict(id=item_id, **_analysis(f"{item_id}:{prompt[:200]}", with_quote)) for item_id in kept]})
+    if "Daily Poll" in prompt:
+        return json.dumps({
+            "question": "Stub poll: which trend matters most?",
+            "options": [{"id": f"opt{i}", "text": text, "votes": 0} for i, text in enumerate(["Agents", "Compilers", "Chips"], 1)],
+        })
+    if '"found"' in prompt:
+        return json.dumps({"found": False})
+    title = re.search(r"Title:\s*(.*)", prompt)
+    return json.dumps(_analysis(title.group(1) if title else prompt[:200], with_quote))
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive, like the real APIs
+    disable_nagle_algorithm = True
+    server: StubLLMServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            return self._send_json(self.server.stats())
+        self._send_json({"error": {"message": "not found"}}, status=404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json({"error": {"message": "not found"}}, status=404)
+
+        request = json.loads(body or b"{}")
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        server = self.server
+        server.count("requests")
+        server.count("prompt_chars", len(prompt))
+
+        with server.lock:
+            delay = server.latency + server.random.uniform(-server.jitter, server.jitter)
+        time.sleep(max(0.0, delay))
+
+        if server.roll(server.rate_429):
+            server.count("rate_limited")
+            return self._send_json(
+                {"error": {"message": "Rate limit reached. Please retry after 1s", "type": "rate_limit_exceeded"}},
+                status=429, headers={"Retry-After": "1"},
+            )
+
+        content = answer(server, prompt)
+        if server.roll(server.malformed_rate):
+            server.count("malformed")
+            content = "```json\n" + content[: len(content) // 2]
+
+        self._send_json({
+            "id": f"chatcmpl-stub-{server.stats()['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub-primary"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+
+def start_stub_server(port: int = 0, latency: float = 0.5, jitter: float = 0.0, rate_429: float = 0.0,
+                      malformed_rate: float = 0.0, drop_rate: float = 0.0, seed: int = 0) -> StubLLMServer:
+    """Starts the stub on a background thread; port 0 picks a free port."""
+    server = StubLLMServer(("127.0.0.1", port), latency, jitter, rate_429, malformed_rate, drop_rate, seed)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub LLM for offline load tests")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of answers with broken JSON")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fraction of items left out of batched answers")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(("127.0.0.1", args.port), args.latency_ms / 1000, args.jitter_ms / 1000,
+                           args.rate_429, args.malformed_rate, args.drop_rate, args.seed)
+    print(f"Stub LLM listening on http://127.0.0.1:{args.port}/v1 (AI_PROVIDER=stub)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass